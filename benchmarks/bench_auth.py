@@ -0,0 +1,268 @@
+"""
+Benchmark suite for the authentication hot path.
+
+Measures `_get_payload`, `create_access_token`, `LoginManager.__call__` as a dependency
+(on fresh requests and on a request whose result is already memoized),
+`LoginManager.optional` and the middleware added by `attach_middleware`, for HS256 and RS256
+secrets and sync and async user loaders. For every case the p50 and p99 latency and the
+throughput are reported.
+
+Run with:
+
+    poetry run python benchmarks/bench_auth.py [--iterations 5000] [--save baseline.json]
+
+Compare against a previously saved baseline, exits with status 1 if the p50 latency
+of a case regressed by more than the threshold:
+
+    poetry run python benchmarks/bench_auth.py --compare baseline.json [--threshold 0.2]
+"""
+
+import argparse
+import asyncio
+import importlib.metadata
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Request
+from fastapi.security import SecurityScopes
+
+from fastapi_login import LoginManager
+
+USERS = {"john@doe.com": {"name": "John"}}
+
+
+def rsa_private_key() -> bytes:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def create_manager(algorithm: str, loader: str) -> LoginManager:
+    secret = rsa_private_key() if algorithm == "RS256" else "benchmark-secret-" * 2
+    manager = LoginManager(secret, "/auth/token", algorithm=algorithm)
+
+    if loader == "async":
+
+        @manager.user_loader()
+        async def load_user(email: str):
+            return USERS.get(email)
+
+    else:
+
+        @manager.user_loader()
+        def load_user(email: str):
+            return USERS.get(email)
+
+    return manager
+
+
+def http_scope(headers) -> Dict[str, Any]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+
+
+def create_app(manager: LoginManager) -> FastAPI:
+    app = FastAPI()
+    manager.attach_middleware(app)
+
+    @app.get("/")
+    async def index(request: Request):
+        return {"authenticated": request.state.user is not None}
+
+    return app
+
+
+async def call_app(app: FastAPI, headers) -> None:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(http_scope(headers), receive, send)
+
+
+def package_version() -> str:
+    try:
+        return importlib.metadata.version("fastapi-login")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def summarize(samples: List[int]) -> Dict[str, float]:
+    """
+    Args:
+        samples (List[int]): Duration of every operation in nanoseconds
+    """
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return {
+        "p50_us": statistics.median(samples) / 1000,
+        "p99_us": p99 / 1000,
+        "ops_per_sec": len(samples) / (sum(samples) / 1e9),
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    for _ in range(min(iterations, 100)):
+        fn()
+
+    samples = []
+    timer = time.perf_counter_ns
+    for _ in range(iterations):
+        start = timer()
+        fn()
+        samples.append(timer() - start)
+    return summarize(samples)
+
+
+async def ameasure(
+    fn: Callable[[], Awaitable[Any]], iterations: int
+) -> Dict[str, float]:
+    for _ in range(min(iterations, 100)):
+        await fn()
+
+    samples = []
+    timer = time.perf_counter_ns
+    for _ in range(iterations):
+        start = timer()
+        await fn()
+        samples.append(timer() - start)
+    return summarize(samples)
+
+
+async def run_cases(iterations: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+
+    for algorithm in ("HS256", "RS256"):
+        for loader in ("sync", "async"):
+            manager = create_manager(algorithm, loader)
+            token = manager.create_access_token(data={"sub": "john@doe.com"})
+            headers = [(b"authorization", f"Bearer {token}".encode())]
+            memoized_request = Request(http_scope(headers))
+            scopes = SecurityScopes()
+
+            if loader == "sync":
+                # Independent of the user loader
+                results[f"{algorithm}/_get_payload"] = measure(
+                    lambda: manager._get_payload(token), iterations
+                )
+                results[f"{algorithm}/create_access_token"] = measure(
+                    lambda: manager.create_access_token(data={"sub": "john@doe.com"}),
+                    iterations,
+                )
+
+            # A new request for every call, the result is memoized on the request scope
+            cases = {
+                "__call__": lambda: manager(Request(http_scope(headers)), scopes),
+                "__call__-memoized": lambda: manager(memoized_request, scopes),
+                "optional": lambda: manager.optional(
+                    Request(http_scope(headers)), scopes
+                ),
+                "middleware": lambda: call_app(app, headers),
+            }
+            app = create_app(manager)
+            for name, fn in cases.items():
+                results[f"{algorithm}/{loader}-loader/{name}"] = await ameasure(
+                    fn, iterations
+                )
+
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> bool:
+    """
+    Prints the change of the p50 latency for every case
+
+    Returns:
+        True if no case regressed by more than the threshold
+    """
+    ok = True
+    for case, result in results.items():
+        previous = baseline.get(case)
+        if previous is None:
+            print(f"{case:<42} new")
+            continue
+
+        change = result["p50_us"] / previous["p50_us"] - 1
+        regressed = change > threshold
+        ok = ok and not regressed
+        print(
+            f"{case:<42} {previous['p50_us']:>10.1f} -> {result['p50_us']:>10.1f} us "
+            f"{change:>+8.1%}{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument(
+        "--save", help="Write the results as JSON baseline to this file"
+    )
+    parser.add_argument("--compare", help="Compare the results against this baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative p50 increase counted as regression, defaults to 0.2",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_cases(args.iterations))
+
+    print(f"{'case':<42} {'p50 us':>10} {'p99 us':>10} {'ops/s':>10}")
+    for case, result in results.items():
+        print(
+            f"{case:<42} {result['p50_us']:>10.1f} {result['p99_us']:>10.1f} "
+            f"{result['ops_per_sec']:>10.0f}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "version": package_version(),
+                    "python": platform.python_version(),
+                    "iterations": args.iterations,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print()
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
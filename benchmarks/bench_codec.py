@@ -0,0 +1,52 @@
+"""
+Compares decoding HS256 tokens using `jwt.decode` and the precompiled `HS256Codec`.
+
+Run with:
+
+    poetry run python benchmarks/bench_codec.py [--iterations 50000]
+"""
+
+import argparse
+import secrets
+import timeit
+
+import jwt
+
+from fastapi_login import LoginManager
+from fastapi_login.codec import HS256Codec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    secret = secrets.token_hex(32)
+    manager = LoginManager(secret, "/auth/token")
+    token = manager.create_access_token(
+        data={"sub": "john@doe.com"}, scopes=["read", "write"]
+    )
+    codec = HS256Codec(secret.encode())
+    assert codec.decode(token) == jwt.decode(
+        token, secret.encode(), algorithms=["HS256"]
+    )
+
+    cases = {
+        "pyjwt": lambda: jwt.decode(token, secret.encode(), algorithms=["HS256"]),
+        "codec": lambda: codec.decode(token),
+    }
+
+    results = {}
+    for name, fn in cases.items():
+        elapsed = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+        results[name] = elapsed / args.iterations
+        print(
+            f"{name:<6} {args.iterations / elapsed:>10.0f} ops/s "
+            f"{results[name] * 1e6:>8.2f} us/op"
+        )
+
+    print(f"speedup {results['pyjwt'] / results['codec']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compares the pure ASGI `LoginMiddleware` against the previously used
+`BaseHTTPMiddleware` based implementation.
+
+Run with:
+
+    poetry run python benchmarks/bench_middleware.py [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from fastapi_login import LoginManager
+from fastapi_login.middleware import LoginMiddleware
+
+USERS = {"john@doe.com": {"name": "John"}}
+
+
+def base_http_middleware(manager: LoginManager):
+    # The previous implementation of `LoginManager.attach_middleware`
+    async def __set_user(request: Request, call_next):
+        try:
+            request.state.user = await manager(request)
+        except Exception:
+            request.state.user = None
+
+        return await call_next(request)
+
+    return __set_user
+
+
+def create_app(kind: str, manager: LoginManager) -> FastAPI:
+    app = FastAPI()
+
+    if kind == "base-http":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=base_http_middleware(manager))
+    else:
+        app.add_middleware(LoginMiddleware, manager=manager)
+
+    @app.get("/")
+    async def index(request: Request):
+        return {"authenticated": request.state.user is not None}
+
+    return app
+
+
+async def call(app, headers):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run(app, headers, requests: int) -> float:
+    # warm up
+    for _ in range(100):
+        await call(app, headers)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, headers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    manager = LoginManager("benchmark-secret-" * 2, "/auth/token")
+    manager.user_loader()(USERS.get)
+    token = manager.create_access_token(data={"sub": "john@doe.com"})
+
+    cases = {
+        "anonymous": [],
+        "authenticated": [(b"authorization", f"Bearer {token}".encode())],
+    }
+
+    for case, headers in cases.items():
+        for kind in ("base-http", "asgi"):
+            app = create_app(kind, manager)
+            elapsed = asyncio.run(run(app, headers, args.requests))
+            print(
+                f"{case:<14} {kind:<10} "
+                f"{args.requests / elapsed:>10.0f} req/s "
+                f"{elapsed / args.requests * 1e6:>8.1f} us/req"
+            )
+
+
+if __name__ == "__main__":
+    main()
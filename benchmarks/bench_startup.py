@@ -0,0 +1,157 @@
+"""
+Measures the cold-start cost of fastapi_login: the time to import the package
+in a fresh interpreter and the time to construct a `LoginManager`.
+
+Importing fastapi_login loads the same cryptography modules as importing PyJWT,
+which imports cryptography itself whenever it is installed. The import time is
+therefore bounded below by the imports of fastapi and jwt, and deferring the
+cryptography imports of fastapi_login does not change it. It only shortens
+the construction of a `LoginManager`.
+The number of loaded cryptography modules is reported for both imports.
+
+Run with:
+
+    poetry run python benchmarks/bench_startup.py [--imports 20] [--save startup.json]
+
+`--compare startup.json [--threshold 0.2]` works the same as for `bench_auth.py`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from bench_auth import compare, package_version, rsa_private_key, summarize
+
+from fastapi_login import KeyRing, LoginManager
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter_ns(); import {module}; "
+    "print(time.perf_counter_ns() - start)"
+)
+
+
+def _environment():
+    env = dict(os.environ)
+    # the package is imported from the working tree
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_samples(module: str, runs: int):
+    env = _environment()
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)], env=env
+        )
+        samples.append(int(output))
+    return samples
+
+
+MODULES_SNIPPET = (
+    "import sys; import {module}; "
+    "print(sum(name.split('.')[0] == 'cryptography' for name in sys.modules))"
+)
+
+
+def cryptography_modules(module: str) -> int:
+    """
+    Returns the number of cryptography modules loaded by importing module
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-c", MODULES_SNIPPET.format(module=module)],
+        env=_environment(),
+    )
+    return int(output)
+
+
+def construction_samples(factory, runs: int):
+    factory()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        factory()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--imports", type=int, default=20)
+    parser.add_argument("--constructions", type=int, default=1000)
+    parser.add_argument(
+        "--save", help="Write the results as JSON baseline to this file"
+    )
+    parser.add_argument("--compare", help="Compare the results against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    private_key = rsa_private_key()
+
+    def keyring_manager():
+        keyring = KeyRing()
+        keyring.add("current", "benchmark-secret-" * 2)
+        return LoginManager(keyring, "/auth/token")
+
+    results = {
+        # fastapi and jwt are imported by fastapi_login, their import time is the lower bound
+        "import/fastapi": summarize(import_samples("fastapi", args.imports)),
+        "import/jwt": summarize(import_samples("jwt", args.imports)),
+        "import/fastapi_login": summarize(
+            import_samples("fastapi_login", args.imports)
+        ),
+        "construct/HS256": summarize(
+            construction_samples(
+                lambda: LoginManager("benchmark-secret-" * 2, "/auth/token"),
+                args.constructions,
+            )
+        ),
+        "construct/RS256": summarize(
+            construction_samples(
+                lambda: LoginManager(private_key, "/auth/token", algorithm="RS256"),
+                args.constructions,
+            )
+        ),
+        "construct/keyring": summarize(
+            construction_samples(keyring_manager, args.constructions)
+        ),
+    }
+
+    print(f"{'case':<42} {'p50 us':>10} {'p99 us':>10}")
+    for case, result in results.items():
+        print(f"{case:<42} {result['p50_us']:>10.1f} {result['p99_us']:>10.1f}")
+
+    print()
+    for module in ("jwt", "fastapi_login"):
+        print(
+            f"cryptography modules loaded by 'import {module}': "
+            f"{cryptography_modules(module)}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "version": package_version(),
+                    "python": platform.python_version(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print()
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
 from .fastapi_login import LoginManager
+from .keyring import KeyRing
 
-__all__ = ["LoginManager"]
+__all__ = ["KeyRing", "LoginManager"]
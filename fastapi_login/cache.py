@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class ExpiringLRUCache:
+    """
+    A bounded, thread safe LRU mapping where every entry carries
+    an absolute expiry timestamp.
+
+    Expired entries are dropped lazily on access, when the cache is full
+    the least recently used entry is evicted.
+    """
+
+    def __init__(
+        self, max_entries: int, timer: Callable[[], float] = time.time
+    ) -> None:
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept in the cache
+            timer (Callable[[], float]): Clock used to compare the expiry timestamps against
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries needs to be a positive integer")
+
+        self.max_entries = max_entries
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # key -> (value, expires_at)
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value stored under key if present and not yet expired.
+
+        Args:
+            key (Hashable): The key to look up
+            default (Any): Returned when the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.timer():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float]) -> None:
+        """
+        Stores value under key until expires_at.
+
+        Args:
+            key (Hashable): The key to store the value under
+            value (Any): The value to store
+            expires_at (float): Absolute timestamp (in terms of `timer`) after which
+                the entry is no longer returned, None keeps the entry until it is evicted
+        """
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Removes key from the cache
+
+        Returns:
+            The removed value or default if key was not present
+        """
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        return entry[0]
+
+    def clear(self) -> None:
+        """
+        Removes all entries, the counters are kept
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            A snapshot of the cache counters and its current size
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,224 @@
+import base64
+import hashlib
+import hmac
+import json
+import re
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import jwt
+from jwt.algorithms import HMACAlgorithm, get_default_algorithms
+from jwt.utils import base64url_encode
+
+# Three non-empty segments using only the base64url alphabet without padding
+_COMPACT_TOKEN = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+
+# Valid last characters of a canonically encoded segment,
+# indexed by the segment length modulo 4. The unused low bits have to be zero.
+_CANONICAL_LAST_CHAR = {2: frozenset("AQgw"), 3: frozenset("AEIMQUYcgkosw048")}
+
+# Claims which are validated in a version dependent way by PyJWT,
+# tokens containing them are always decoded by PyJWT
+_DELEGATED_CLAIMS = ("nbf", "iat", "aud", "iss")
+
+# Same output as the json.dumps(..., separators=(",", ":")) call used by PyJWT,
+# without creating a new encoder for every token
+_COMPACT_JSON = json.JSONEncoder(separators=(",", ":"))
+_COMPACT_SORTED_JSON = json.JSONEncoder(separators=(",", ":"), sort_keys=True)
+
+# PyJWT sorts the header fields since 2.5, before it keeps "typ" first
+_HEADER_JSON = (
+    _COMPACT_SORTED_JSON
+    if tuple(int(part) for part in jwt.__version__.split(".")[:2]) >= (2, 5)
+    else _COMPACT_JSON
+)
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _is_canonical(segment: str) -> bool:
+    rem = len(segment) % 4
+    if rem == 1:
+        return False
+    allowed = _CANONICAL_LAST_CHAR.get(rem)
+    return allowed is None or segment[-1] in allowed
+
+
+class HS256Codec:
+    """
+    Decoder for HS256 tokens which avoids the generic code path of PyJWT.
+
+    The HMAC key is prepared once, and tokens are verified using a fixed sequence:
+    split, constant-time signature comparison, JSON parsing and expiry check.
+    Every token for which the result of the fast path could differ from
+    `jwt.decode`, e.g. because of additional header parameters or claims with
+    version dependent validation, is passed on to `jwt.decode`.
+    Hence, the codec accepts and rejects exactly the same tokens as PyJWT.
+    """
+
+    algorithm = "HS256"
+
+    def __init__(self, key: bytes) -> None:
+        """
+        Args:
+            key (bytes): The HMAC secret
+        """
+        self._key = key
+        try:
+            prepared = HMACAlgorithm(HMACAlgorithm.SHA256).prepare_key(key)
+        except jwt.InvalidKeyError:
+            # PyJWT refuses to use this key, so should we
+            self._mac = None
+        else:
+            self._mac = hmac.new(prepared, digestmod=hashlib.sha256)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verifies and decodes the token
+
+        Args:
+            token (str): The encoded JWT
+
+        Returns:
+            The payload of the token
+
+        Raises:
+            jwt.PyJWTError: The token is invalid
+        """
+        if (
+            self._mac is None
+            or not isinstance(token, str)
+            or _COMPACT_TOKEN.fullmatch(token) is None
+        ):
+            return self._fallback(token)
+
+        header_segment, payload_segment, signature_segment = token.split(".")
+        if not (
+            _is_canonical(header_segment)
+            and _is_canonical(payload_segment)
+            and _is_canonical(signature_segment)
+        ):
+            return self._fallback(token)
+
+        signing_input = token[: len(header_segment) + len(payload_segment) + 1]
+        mac = self._mac.copy()
+        mac.update(signing_input.encode("ascii"))
+        if not hmac.compare_digest(mac.digest(), _b64decode(signature_segment)):
+            raise jwt.InvalidSignatureError("Signature verification failed")
+
+        try:
+            header = json.loads(_b64decode(header_segment))
+            payload = json.loads(_b64decode(payload_segment))
+        except (ValueError, RecursionError):
+            return self._fallback(token)
+
+        if (
+            not isinstance(header, dict)
+            or header.get("alg") != self.algorithm
+            or not isinstance(header.get("typ", ""), str)
+            or len(header) > 1 + ("typ" in header)
+            or not isinstance(payload, dict)
+        ):
+            return self._fallback(token)
+
+        exp = payload.get("exp")
+        if (
+            type(exp) is not int
+            or any(claim in payload for claim in _DELEGATED_CLAIMS)
+            or not isinstance(payload.get("sub", ""), str)
+            or not isinstance(payload.get("jti", ""), str)
+        ):
+            return self._fallback(token)
+
+        if exp <= time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
+
+        return payload
+
+    def _fallback(self, token: str) -> Dict[str, Any]:
+        return jwt.decode(token, self._key, algorithms=[self.algorithm])
+
+
+class TokenEncoder:
+    """
+    Encoder which produces byte-for-byte the same tokens as `jwt.encode`.
+
+    The header segment and the signing key are prepared once, so that encoding
+    a token only requires serializing the claims and signing them.
+    Payloads which PyJWT transforms or validates while encoding,
+    e.g. `datetime` claims or an `iss` claim, are passed on to `jwt.encode`.
+    """
+
+    def __init__(
+        self, key: Any, algorithm: str, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Args:
+            key (Any): The key used to sign the tokens, as accepted by `jwt.encode`
+            algorithm (str): The signing algorithm
+            headers (Dict[str, str]): Additional header fields, e.g. `{"kid": "key-id"}`
+        """
+        self.key = key
+        self.algorithm = algorithm
+        self.headers = headers
+        self._header_segment = base64url_encode(
+            _HEADER_JSON.encode(
+                {"typ": "JWT", "alg": algorithm, **(headers or {})}
+            ).encode()
+        )
+
+        # `jwt.get_algorithm_by_name` requires PyJWT 2.6
+        alg_obj = get_default_algorithms().get(algorithm)
+        if alg_obj is None:
+            raise NotImplementedError("Algorithm not supported")
+        try:
+            prepared = alg_obj.prepare_key(key)
+        except jwt.InvalidKeyError:
+            # let PyJWT raise the error on every call
+            self._sign = None
+            return
+
+        check_key_length = getattr(alg_obj, "check_key_length", None)
+        key_length_msg = check_key_length(prepared) if check_key_length else None
+        if key_length_msg:
+            warnings.warn(key_length_msg, jwt.InsecureKeyLengthWarning, stacklevel=2)
+
+        if isinstance(alg_obj, HMACAlgorithm):
+            mac = hmac.new(prepared, digestmod=alg_obj.hash_alg)
+
+            def sign(msg: bytes) -> bytes:
+                m = mac.copy()
+                m.update(msg)
+                return m.digest()
+
+            self._sign = sign
+        else:
+            self._sign = lambda msg: alg_obj.sign(msg, prepared)
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        """
+        Encodes and signs the payload
+
+        Args:
+            payload (Dict[str, Any]): The claims of the token
+
+        Returns:
+            The encoded JWT
+        """
+        if (
+            self._sign is None
+            or "iss" in payload
+            or isinstance(payload.get("exp"), datetime)
+            or isinstance(payload.get("iat"), datetime)
+            or isinstance(payload.get("nbf"), datetime)
+        ):
+            return jwt.encode(payload, self.key, self.algorithm, headers=self.headers)
+
+        payload_segment = base64url_encode(_COMPACT_JSON.encode(payload).encode())
+        signing_input = self._header_segment + b"." + payload_segment
+        signature = base64url_encode(self._sign(signing_input))
+        return (signing_input + b"." + signature).decode()
@@ -1,5 +1,9 @@
 from fastapi import HTTPException
-from starlette.status import HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_429_TOO_MANY_REQUESTS,
+)
 
 # Reference: https://datatracker.ietf.org/doc/html/rfc6749#section-5.2
 
@@ -14,3 +18,8 @@ InsufficientScopeException = HTTPException(
     detail="Insufficient scope",
     headers={"WWW-Authenticate": "Bearer"},
 )
+
+TooManyAttemptsException = HTTPException(
+    status_code=HTTP_429_TOO_MANY_REQUESTS,
+    detail="Too many failed attempts",
+)
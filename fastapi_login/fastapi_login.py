@@ -1,25 +1,103 @@
+import hashlib
 import inspect
-from datetime import datetime, timedelta, timezone
-from typing import Any, Awaitable, Callable, Collection, Dict, Optional, Type, Union
-
+import math
+import secrets
+import time
+from concurrent.futures import Executor
+from datetime import timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+import anyio
 import jwt
 from anyio.to_thread import run_sync
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from .exceptions import InsufficientScopeException, InvalidCredentialsException
-from .secrets import to_secret
-from .utils import ordered_partial
+from starlette.requests import HTTPConnection
+
+from .cache import ExpiringLRUCache
+from .codec import HS256Codec, TokenEncoder
+from .exceptions import (
+    InsufficientScopeException,
+    InvalidCredentialsException,
+    TooManyAttemptsException,
+)
+from .keyring import KeyRing
+from .metrics import AuthMetrics
+from .middleware import LoginMiddleware
+from .minting import aencode_tokens, encode_tokens, iter_encode_tokens
+from .precheck import TokenPrecheck
+from .ratelimit import RateLimiter
+from .refresh import (
+    DEFAULT_REFRESH_EXPIRY,
+    REFRESH_ONLY_CLAIMS,
+    REFRESH_TOKEN_TYPE,
+    TOKEN_TYPE_CLAIM,
+    InMemoryRefreshStore,
+    RefreshRecord,
+    RefreshTokenStore,
+    TokenPair,
+)
+from .revocation import RevocationList
+from .secrets import load_secret
+from .utils import BatchLoader, SingleFlight, ordered_partial
 
 SECRET_TYPE = Union[str, bytes]
 CUSTOM_EXCEPTION = Union[Type[Exception], Exception]
 
 
+# Claim holding the scopes of the token as bitmask, see `scope_bitmask`
+SCOPE_BITS_CLAIM = "scope_bits"
+
+
+# Key of the ASGI scope under which the authentication results of a request are kept
+_SCOPE_KEY = "fastapi_login.auth"
+
+# Key of the ASGI scope holding the managers which already counted a failed attempt of the request
+_RATE_LIMITED_KEY = "fastapi_login.rate_limited"
+
+
+class _AuthResult:
+    """
+    Verified payload, and the user once loaded, of the token of the current request
+    """
+
+    __slots__ = ("payload", "user", "user_loaded")
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+        self.user: Any = None
+        self.user_loaded = False
+
+
+def _failure_reason(error: jwt.PyJWTError) -> str:
+    """
+    Maps the error raised while decoding a token to the reason reported to `AuthMetrics`
+    """
+    if isinstance(error, jwt.ExpiredSignatureError):
+        return "expired"
+    if isinstance(error, jwt.InvalidSignatureError):
+        return "bad_signature"
+    return "invalid_token"
+
+
 class LoginManager(OAuth2PasswordBearer):
     def __init__(
         self,
-        secret: Union[SECRET_TYPE, Dict[str, SECRET_TYPE]],
+        secret: Union[SECRET_TYPE, Dict[str, SECRET_TYPE], KeyRing],
         token_url: str,
         algorithm="HS256",
         use_cookie=False,
@@ -29,12 +107,28 @@ class LoginManager(OAuth2PasswordBearer):
         default_expiry: timedelta = timedelta(minutes=15),
         scopes: Optional[Dict[str, str]] = None,
         out_of_scope_exception: CUSTOM_EXCEPTION = InsufficientScopeException,
+        payload_cache_size: int = 0,
+        fast_codec: bool = False,
+        signing_executor: Optional[Executor] = None,
+        signing_concurrency: int = 8,
+        refresh_store: Optional[RefreshTokenStore] = None,
+        metrics: Optional[AuthMetrics] = None,
+        scope_bitmask: bool = False,
+        negative_cache_size: int = 0,
+        negative_cache_ttl: Union[timedelta, float] = 10.0,
+        precheck: Optional[TokenPrecheck] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_limit_exception: CUSTOM_EXCEPTION = TooManyAttemptsException,
     ):
         """
         Initializes LoginManager
 
         Args:
-            algorithm (str): Should be "HS256" or "RS256" used to decrypt the JWT
+            secret: The secret used to sign the tokens. Pass a `fastapi_login.keyring.KeyRing`
+                to sign and verify using multiple keys identified by their `kid` header,
+                in this case `secret` and `algorithm` are taken from the keys in the keyring
+                and `LoginManager.secret` is None
+            algorithm (str): Should be "HS256", "RS256", "ES256", "ES384" or "EdDSA" used to decrypt the JWT
             token_url (str): The url where the user can login to get the token
             use_cookie (bool): Set if cookies should be checked for the token
             use_header (bool): Set if headers should be checked for the token
@@ -46,16 +140,61 @@ class LoginManager(OAuth2PasswordBearer):
                 `https://fastapi.tiangolo.com/advanced/security/oauth2-scopes/#oauth2-security-scheme`
             out_of_scope_exception (Union[Type[Exception], Exception]): Exception to raise when the user is out of scopes,
                 if not set, default is `fastapi_login.exceptions.InsufficientScopeException`
+            payload_cache_size (int): Maximum number of verified token payloads to keep in memory,
+                entries expire together with their token. Defaults to 0, which disables the cache
+            fast_codec (bool): Only for HS256, decode tokens using a precompiled codec instead of
+                the generic code path of PyJWT. The codec accepts exactly the same tokens
+            signing_executor (concurrent.futures.Executor): Thread or process pool used by
+                `acreate_access_token` to sign tokens, defaults to the thread pool of anyio
+            signing_concurrency (int): Maximum number of tokens signed concurrently by
+                `acreate_access_token`, further calls wait for a free slot. Defaults to 8
+            refresh_store (RefreshTokenStore): Storage of the issued refresh tokens, defaults to
+                `fastapi_login.refresh.InMemoryRefreshStore`
+            metrics (AuthMetrics): Records the latency of the authentication stages
+                and the reasons of failed authentications, disabled by default
+            scope_bitmask (bool): Store the scopes of new tokens as a single integer, with one bit
+                per scope declared in `scopes`. New scopes must only be appended to `scopes`,
+                as the bits are assigned in order. Tokens with a list of scopes are still accepted
+            negative_cache_size (int): Maximum number of rejected tokens to remember, so that
+                repeatedly sent invalid tokens are rejected without verifying them again.
+                Defaults to 0, which disables the cache
+            negative_cache_ttl (datetime.timedelta or float): Time in seconds for which
+                a rejected token is remembered, defaults to 10 seconds
+            precheck (TokenPrecheck): Structural checks of the token, e.g. its length and
+                `alg` header, which reject malformed tokens before verifying their signature.
+                Disabled by default
+            rate_limiter (RateLimiter): Limits the failed authentication attempts per client ip
+                and per user, clients over the limit are rejected before their token is decoded.
+                Disabled by default
+            rate_limit_exception (Union[Type[Exception], Exception]): Exception to raise when
+                the client or user is over the limit of `rate_limiter`, defaults to
+                `fastapi_login.exceptions.TooManyAttemptsException`
         """
         if use_cookie is False and use_header is False:
             raise AttributeError(
                 "use_cookie and use_header are both False one of them needs to be True"
             )
-        if isinstance(secret, str):
-            secret = secret.encode()
-
-        self.secret = to_secret({"algorithms": algorithm, "secret": secret})
+        if signing_concurrency < 1:
+            raise ValueError("signing_concurrency must be at least 1")
+        if scope_bitmask and not scopes:
+            raise ValueError("scope_bitmask requires the scopes to be declared")
+        if isinstance(secret, KeyRing):
+            if secret.current_kid is None:
+                raise ValueError("The keyring does not contain any keys")
+            self.keyring: Optional[KeyRing] = secret
+            self.secret = None
+        else:
+            if isinstance(secret, str):
+                secret = secret.encode()
+            self.keyring = None
+            self.secret = load_secret({"algorithms": algorithm, "secret": secret})
         self.algorithm = algorithm
+        self._codec: Optional[HS256Codec] = None
+        self._encoder: Optional[TokenEncoder] = None
+        if fast_codec:
+            if self.keyring is not None or algorithm != HS256Codec.algorithm:
+                raise ValueError("fast_codec is only supported for HS256 secrets")
+            self._codec = HS256Codec(self.secret.secret_for_decode)
         self.oauth_scheme = None
         self.use_cookie = use_cookie
         self.use_header = use_header
@@ -64,8 +203,44 @@ class LoginManager(OAuth2PasswordBearer):
 
         # private
         self._user_callback: Optional[ordered_partial] = None
+        self._user_callback_is_async = False
+        self._user_thread_limiter: Optional[anyio.CapacityLimiter] = None
+        self._user_cache: Optional[ExpiringLRUCache] = None
+        self._user_cache_ttl: float = 0.0
+        self._user_loads: Optional[SingleFlight] = None
+        self._signing_executor = signing_executor
+        self._signing_concurrency = signing_concurrency
+        # created on first use, as it has to be created inside the event loop
+        self._signing_limiter: Optional[anyio.CapacityLimiter] = None
         self._not_authenticated_exception = not_authenticated_exception
         self._out_of_scope_exception = out_of_scope_exception
+        self._payload_cache: Optional[ExpiringLRUCache] = (
+            ExpiringLRUCache(payload_cache_size) if payload_cache_size > 0 else None
+        )
+        self._negative_cache: Optional[ExpiringLRUCache] = (
+            ExpiringLRUCache(negative_cache_size, timer=time.monotonic)
+            if negative_cache_size > 0
+            else None
+        )
+        self._negative_cache_ttl = (
+            negative_cache_ttl.total_seconds()
+            if isinstance(negative_cache_ttl, timedelta)
+            else float(negative_cache_ttl)
+        )
+        self.precheck = precheck
+        self.rate_limiter = rate_limiter
+        self._rate_limit_exception = rate_limit_exception
+        # created by the first call to `revoke`, until then tokens are not checked
+        self.revocations: Optional[RevocationList] = None
+        self.metrics = metrics
+        self._scope_bits: Optional[Dict[str, int]] = (
+            {scope: 1 << i for i, scope in enumerate(scopes)} if scope_bitmask else None
+        )
+        # masks of the scope combinations required by the routes, computed on first use
+        self._required_masks: Dict[Tuple[str, ...], Optional[int]] = {}
+        self.refresh_store: RefreshTokenStore = (
+            refresh_store if refresh_store is not None else InMemoryRefreshStore()
+        )
 
         # we take over the exception raised possibly by setting auto_error to False
         super().__init__(tokenUrl=token_url, auto_error=False, scopes=scopes)
@@ -86,7 +261,31 @@ class LoginManager(OAuth2PasswordBearer):
         """
         return self._not_authenticated_exception
 
-    def user_loader(self, *args, **kwargs) -> Union[Callable, Callable[..., Awaitable]]:
+    @property
+    def rate_limit_exception(self):
+        """
+        Exception raised when the client or user has too many failed attempts.
+        Defaults to `fastapi_login.exceptions.TooManyAttemptsException`
+        """
+        return self._rate_limit_exception
+
+    @property
+    def payload_cache(self) -> Optional[ExpiringLRUCache]:
+        """
+        Cache of verified token payloads, None if `payload_cache_size` was not set.
+        Use `payload_cache.stats()` to inspect the hit, miss and eviction counters.
+        """
+        return self._payload_cache
+
+    def user_loader(
+        self,
+        *args,
+        cache_ttl: Optional[Union[timedelta, float]] = None,
+        max_entries: int = 1024,
+        coalesce: bool = False,
+        thread_limiter: Optional[int] = None,
+        **kwargs,
+    ) -> Union[Callable, Callable[..., Awaitable]]:
         """
         This sets the callback to retrieve the user.
         The function should take an unique identifier like an email
@@ -109,8 +308,21 @@ class LoginManager(OAuth2PasswordBearer):
             >>> def get_user(user_identifier, ...):
             ...     # get user logic here
 
+            >>> @manager.user_loader(cache_ttl=timedelta(seconds=30))  # Keep loaded users in memory
+            >>> def get_user(user_identifier):
+            ...     # get user logic here
+
         Args:
             args: Positional arguments to pass on to the decorated method
+            cache_ttl (datetime.timedelta or float): If set, loaded users are cached in memory
+                for the given time (in seconds if a number is given).
+                Use `invalidate_user` or `clear_user_cache` to evict cached users.
+            max_entries (int): Maximum number of users kept in the cache, defaults to 1024
+            coalesce (bool): If True, concurrent loads of the same identifier share a single
+                call of the callback, its result or exception is passed to every waiting request
+            thread_limiter (int): Only for sync callbacks, the maximum number of threads
+                running the callback at the same time. By default sync callbacks share the
+                default thread pool of anyio with sync endpoints and dependencies
             kwargs: Keyword arguments to pass on to the decorated method
 
         Returns:
@@ -126,11 +338,137 @@ class LoginManager(OAuth2PasswordBearer):
             Returns:
                 Partial of the callback with given args and keyword arguments already set
             """
-            self._user_callback = ordered_partial(callback, *args, **kwargs)
+            self._set_user_callback(
+                ordered_partial(callback, *args, **kwargs), thread_limiter
+            )
+            self._user_loads = SingleFlight() if coalesce else None
+            self._setup_user_cache(cache_ttl, max_entries)
             return callback
 
         return decorator
 
+    def batch_user_loader(
+        self,
+        *args,
+        max_batch: int = 100,
+        window_ms: float = 0,
+        cache_ttl: Optional[Union[timedelta, float]] = None,
+        max_entries: int = 1024,
+        thread_limiter: Optional[int] = None,
+        **kwargs,
+    ) -> Union[Callable, Callable[..., Awaitable]]:
+        """
+        Alternative to `user_loader`, which sets a callback that loads many users at once.
+        Identifiers requested during one event loop iteration, or within `window_ms`,
+        are combined into a single call of the callback.
+
+        The callback takes a list of unique identifiers and returns either a list of
+        users (or None) in the same order, or a dictionary mapping identifiers to users.
+
+        Basic usage:
+
+            >>> @manager.batch_user_loader(max_batch=50, window_ms=2)
+            >>> async def get_users(identifiers, ...):
+            ...     # e.g. SELECT * FROM users WHERE email IN (...)
+
+        Args:
+            args: Positional arguments to pass on to the decorated method
+            max_batch (int): Maximum number of identifiers passed to the callback at once
+            window_ms (float): Time in milliseconds to wait for further identifiers after
+                the first one was requested. Defaults to 0, which only waits for
+                one event loop iteration
+            cache_ttl (datetime.timedelta or float): See `user_loader`
+            max_entries (int): See `user_loader`
+            thread_limiter (int): See `user_loader`
+            kwargs: Keyword arguments to pass on to the decorated method
+
+        Returns:
+            The callback
+        """
+
+        def decorator(callback: Union[Callable, Callable[..., Awaitable]]):
+            batch_loader = BatchLoader(
+                ordered_partial(callback, *args, **kwargs),
+                max_batch=max_batch,
+                window_ms=window_ms,
+                limiter=(
+                    anyio.CapacityLimiter(thread_limiter)
+                    if thread_limiter is not None
+                    else None
+                ),
+            )
+            self._set_user_callback(ordered_partial(batch_loader.load), None)
+            # identifiers are already deduplicated inside a batch
+            self._user_loads = None
+            self._setup_user_cache(cache_ttl, max_entries)
+            return callback
+
+        return decorator
+
+    def _set_user_callback(
+        self, callback: ordered_partial, thread_limiter: Optional[int]
+    ) -> None:
+        """
+        Sets the callback and decides once how it is called, see `_call_user_loader`
+        """
+        if thread_limiter is not None and thread_limiter < 1:
+            raise ValueError("thread_limiter must be at least 1")
+
+        self._user_callback = callback
+        self._user_callback_is_async = inspect.iscoroutinefunction(callback)
+        self._user_thread_limiter = (
+            anyio.CapacityLimiter(thread_limiter)
+            if thread_limiter is not None and not self._user_callback_is_async
+            else None
+        )
+
+    def _setup_user_cache(
+        self, cache_ttl: Optional[Union[timedelta, float]], max_entries: int
+    ) -> None:
+        if cache_ttl is None:
+            self._user_cache = None
+            return
+
+        self._user_cache_ttl = (
+            cache_ttl.total_seconds()
+            if isinstance(cache_ttl, timedelta)
+            else float(cache_ttl)
+        )
+        self._user_cache = ExpiringLRUCache(max_entries, timer=time.monotonic)
+
+    @property
+    def negative_cache(self) -> Optional[ExpiringLRUCache]:
+        """
+        Cache of recently rejected tokens, None if `negative_cache_size` was not set.
+        `negative_cache.stats()["hits"]` counts the tokens rejected without verifying them again.
+        """
+        return self._negative_cache
+
+    @property
+    def user_cache(self) -> Optional[ExpiringLRUCache]:
+        """
+        Cache of loaded users, None if `user_loader` was registered without `cache_ttl`
+        """
+        return self._user_cache
+
+    def invalidate_user(self, identifier: Any) -> None:
+        """
+        Removes the user stored under identifier from the user cache,
+        the next request for this user calls the `user_loader` callback again
+
+        Args:
+            identifier (Any): The user identifier expected by `_user_callback`
+        """
+        if self._user_cache is not None:
+            self._user_cache.pop(identifier)
+
+    def clear_user_cache(self) -> None:
+        """
+        Removes all users from the user cache
+        """
+        if self._user_cache is not None:
+            self._user_cache.clear()
+
     def _get_payload(self, token: str) -> Dict[str, Any]:
         """
         Returns the decoded token payload.
@@ -145,16 +483,234 @@ class LoginManager(OAuth2PasswordBearer):
         Raises:
             LoginManager.not_authenticated_exception: The token is invalid or None was returned by `_load_user`
         """
+        metrics = self.metrics
+        start = time.perf_counter() if metrics is not None else 0.0
         try:
-            payload = jwt.decode(
-                token, self.secret.secret_for_decode, algorithms=[self.algorithm]
-            )
+            cache_key, payload = self._lookup_caches(token)
+            if payload is None:
+                payload = self._verify_and_cache(token, cache_key)
+            self._post_checks(payload)
             return payload
+        finally:
+            if metrics is not None:
+                metrics.observe("payload", time.perf_counter() - start)
+
+    def _reject(self, reason: str) -> NoReturn:
+        """
+        Counts the failure and raises `LoginManager.not_authenticated_exception`
+
+        Args:
+            reason (str): One of `fastapi_login.metrics.FAILURE_REASONS`
+        """
+        if self.metrics is not None:
+            self.metrics.failure(reason)
+        raise self.not_authenticated_exception
+
+    def _lookup_caches(
+        self, token: str
+    ) -> Tuple[Optional[bytes], Optional[Dict[str, Any]]]:
+        """
+        Looks the token up in the cache of rejected tokens and in the payload cache
+
+        Returns:
+            The cache key of the token, None if both caches are disabled,
+            and the cached payload, None if the token has not been cached
+
+        Raises:
+            LoginManager.not_authenticated_exception: The token has been rejected recently
+        """
+        cache = self._payload_cache
+        negative_cache = self._negative_cache
+        if cache is None and negative_cache is None:
+            return None, None
+
+        # Only the digest is stored, so the caches never hold usable tokens
+        cache_key = hashlib.sha256(token.encode()).digest()
+        if negative_cache is not None:
+            reason = negative_cache.get(cache_key)
+            if reason is not None:
+                self._reject(reason)
+
+        if cache is not None:
+            entry = cache.get(cache_key)
+            if entry is not None:
+                payload, kid = entry
+                # the key might have been retired since the payload was cached
+                if kid is None or self.keyring.get(kid) is not None:
+                    # a copy, changes of one request must not leak into the next
+                    return cache_key, dict(payload)
+
+        return cache_key, None
+
+    def _precheck(self, token: str) -> None:
+        """
+        Runs the structural checks of `precheck`, if set
+
+        Raises:
+            LoginManager.not_authenticated_exception: The token is malformed
+        """
+        precheck = self.precheck
+        if precheck is None:
+            return
+
+        algorithms = (
+            (self.algorithm,) if self.keyring is None else self.keyring.algorithms
+        )
+        reason = precheck.check(token, algorithms)
+        if reason is not None:
+            self._reject(reason)
+
+    def _verify_and_cache(
+        self, token: str, cache_key: Optional[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Verifies the token, and stores the payload or the reason of the rejection in the caches
+
+        Args:
+            token (str): The token to verify
+            cache_key (bytes): The key returned by `_lookup_caches`
+
+        Raises:
+            LoginManager.not_authenticated_exception: The token is invalid
+        """
+        # Cached payloads have already passed the full verification
+        self._precheck(token)
+
+        try:
+            payload, kid = self._decode_token(token)
 
         # This includes all errors raised by pyjwt
+        except jwt.PyJWTError as e:
+            reason = _failure_reason(e)
+            negative_cache = self._negative_cache
+            # tokens which are not valid yet become valid later on
+            if negative_cache is not None and not isinstance(
+                e, jwt.ImmatureSignatureError
+            ):
+                negative_cache.set(
+                    cache_key,
+                    reason,
+                    negative_cache.timer() + self._negative_cache_ttl,
+                )
+            self._reject(reason)
+
+        cache = self._payload_cache
+        if cache is not None:
+            # Tokens without an expiry are not cached
+            exp = payload.get("exp")
+            if isinstance(exp, (int, float)):
+                cache.set(cache_key, (dict(payload), kid), exp)
+
+        return payload
+
+    def _post_checks(self, payload: Dict[str, Any]) -> None:
+        """
+        Checks of the verified payload, which also apply to cached payloads
+
+        Raises:
+            LoginManager.not_authenticated_exception: The token has been revoked
+                or is a refresh token
+        """
+        # Checked for cached payloads as well, as the token might have been revoked since
+        revocations = self.revocations
+        if revocations is not None and revocations.is_revoked(payload.get("jti")):
+            self._reject("revoked")
+
+        # refresh tokens can only be exchanged for new access tokens
+        if payload.get(TOKEN_TYPE_CLAIM) == REFRESH_TOKEN_TYPE:
+            self._reject("invalid_token")
+
+    def revoke(self, token: str) -> None:
+        """
+        Revokes the token, it is rejected from now on until it expires.
+        Only tokens with a `jti` claim, as added by `create_access_token`, can be revoked.
+
+        Args:
+            token (str): The encoded JWT
+
+        Raises:
+            LoginManager.not_authenticated_exception: The token is invalid
+            ValueError: The token does not have a `jti` claim
+        """
+        try:
+            payload, _ = self._decode_token(token)
+        except jwt.ExpiredSignatureError:
+            # Expired tokens are rejected anyway
+            return
         except jwt.PyJWTError:
             raise self.not_authenticated_exception
 
+        jti = payload.get("jti")
+        if not isinstance(jti, str):
+            raise ValueError("Only tokens with a jti claim can be revoked")
+
+        if self.revocations is None:
+            self.revocations = RevocationList()
+        exp = payload.get("exp")
+        self.revocations.add(jti, exp if isinstance(exp, (int, float)) else None)
+
+    async def revoke_request(self, request: Request) -> None:
+        """
+        Revokes the token of the request, e.g. in a logout route
+
+        Basic usage:
+
+            >>> @app.post("/logout")
+            >>> async def logout(request: Request, user=Depends(manager)):
+            ...     await manager.revoke_request(request)
+
+        Args:
+            request (fastapi.Request): The request containing the token
+
+        Raises:
+            LoginManager.not_authenticated_exception: No (valid) token is present
+            ValueError: The token does not have a `jti` claim
+        """
+        self.revoke(await self._get_token(request))
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Args:
+            jti (str): The `jti` claim of a token
+
+        Returns:
+            True if the token with this id has been revoked
+        """
+        return self.revocations is not None and self.revocations.is_revoked(jti)
+
+    def _decode_token(self, token: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Verifies and decodes the token using the secret of the instance,
+        or the key referenced by the `kid` header if a keyring is used
+
+        Args:
+            token (str): The token to decode
+
+        Returns:
+            The payload of the token and the id of the key which verified it,
+            None if no keyring is used
+
+        Raises:
+            jwt.PyJWTError: The token is invalid
+        """
+        if self._codec is not None:
+            return self._codec.decode(token), None
+
+        if self.keyring is None:
+            payload = jwt.decode(
+                token, self.secret.secret_for_decode, algorithms=[self.algorithm]
+            )
+            return payload, None
+
+        key = self.keyring.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise jwt.InvalidKeyError("Unknown or retired key id")
+
+        payload = jwt.decode(
+            token, key.secret.secret_for_decode, algorithms=[key.algorithm]
+        )
+        return payload, key.kid
+
     def _has_scopes(
         self, payload: Dict[str, Any], required_scopes: Optional[SecurityScopes]
     ) -> bool:
@@ -168,21 +724,94 @@ class LoginManager(OAuth2PasswordBearer):
         Returns:
             True if the required scopes are contained in the tokens payload
         """
-        if required_scopes is None or not required_scopes.scopes:
-            # According to RFC 6749, the scopes are optional
+        metrics = self.metrics
+        start = time.perf_counter() if metrics is not None else 0.0
+        try:
+            if required_scopes is None or not required_scopes.scopes:
+                # According to RFC 6749, the scopes are optional
+                return True
+
+            # when the manager was invoked using fastapi.Security(manager, scopes=[...])
+            # we have to check if all required scopes are contained in the token
+            scope_bits = payload.get(SCOPE_BITS_CLAIM)
+            if scope_bits is not None and self._scope_bits is not None:
+                required = self._required_mask(required_scopes.scopes)
+                granted = (
+                    required is not None
+                    and type(scope_bits) is int
+                    and scope_bits & required == required
+                )
+            else:
+                # tokens created without scope_bitmask
+                provided_scopes = payload.get("scopes", [])
+                granted = len(provided_scopes) >= len(required_scopes.scopes) and all(
+                    scope in provided_scopes for scope in required_scopes.scopes
+                )
+
+            if not granted:
+                if metrics is not None:
+                    metrics.failure("scope")
+                return False
+
             return True
+        finally:
+            if metrics is not None:
+                metrics.observe("scopes", time.perf_counter() - start)
 
-        # when the manager was invoked using fastapi.Security(manager, scopes=[...])
-        # we have to check if all required scopes are contained in the token
-        provided_scopes = payload.get("scopes", [])
-        # Check if enough scopes are present
-        if len(provided_scopes) < len(required_scopes.scopes):
-            return False
-        # Check if all required scopes are present
-        elif any(scope not in provided_scopes for scope in required_scopes.scopes):
-            return False
+    def _required_mask(self, scopes: List[str]) -> Optional[int]:
+        """
+        Returns the bitmask of the scopes, None if one of them has not been declared
+        """
+        key = tuple(scopes)
+        try:
+            return self._required_masks[key]
+        except KeyError:
+            pass
+
+        mask: Optional[int] = 0
+        for scope in scopes:
+            bit = self._scope_bits.get(scope)
+            if bit is None:
+                # can never be granted
+                mask = None
+                break
+            mask |= bit
+
+        self._required_masks[key] = mask
+        return mask
+
+    def _scope_mask(self, scopes: Collection[str]) -> int:
+        """
+        Returns the bitmask of the scopes granted to a new token
+
+        Raises:
+            ValueError: One of the scopes has not been declared
+        """
+        mask = 0
+        for scope in scopes:
+            bit = self._scope_bits.get(scope)
+            if bit is None:
+                raise ValueError(f"Unknown scope: {scope}")
+            mask |= bit
+        return mask
+
+    def scopes_of(self, payload: Dict[str, Any]) -> List[str]:
+        """
+        Returns the scopes granted by the token, both for tokens created
+        with and without `scope_bitmask`
+
+        Args:
+            payload (Dict[str, Any]): The decoded JWT payload
 
-        return True
+        Returns:
+            The names of the granted scopes
+        """
+        scope_bits = payload.get(SCOPE_BITS_CLAIM)
+        if type(scope_bits) is int and self._scope_bits is not None:
+            return [
+                scope for scope, bit in self._scope_bits.items() if scope_bits & bit
+            ]
+        return list(payload.get("scopes", []))
 
     def has_scopes(self, token: str, required_scopes: SecurityScopes) -> bool:
         """
@@ -216,10 +845,14 @@ class LoginManager(OAuth2PasswordBearer):
         # the identifier should be stored under the sub (subject) key
         user_identifier = payload.get("sub")
         if user_identifier is None:
+            if self.metrics is not None:
+                self.metrics.failure("invalid_token")
             raise self.not_authenticated_exception
 
         user = await self._load_user(user_identifier)
         if user is None:
+            if self.metrics is not None:
+                self.metrics.failure("unknown_user")
             raise self.not_authenticated_exception
 
         return user
@@ -253,16 +886,111 @@ class LoginManager(OAuth2PasswordBearer):
         Raises:
             Exception: When no ``user_loader`` has been set
         """
-        if self._user_callback is None:
-            raise Exception("Missing user_loader callback")
+        metrics = self.metrics
+        start = time.perf_counter() if metrics is not None else 0.0
+        try:
+            if self._user_callback is None:
+                raise Exception("Missing user_loader callback")
+
+            cache = self._user_cache
+            if cache is not None:
+                user = cache.get(identifier)
+                if user is not None:
+                    return user
+
+            if self._user_loads is not None:
+                return await self._user_loads.do(
+                    identifier, self._call_user_loader, identifier
+                )
+
+            return await self._call_user_loader(identifier)
+        finally:
+            if metrics is not None:
+                metrics.observe("user", time.perf_counter() - start)
+
+    async def _call_user_loader(self, identifier: Any):
+        """
+        Calls `_user_callback` and stores the result in the user cache if enabled
+
+        Args:
+            identifier (Any): The user identifier expected by `_user_callback`
 
-        if inspect.iscoroutinefunction(self._user_callback):
+        Returns:
+            The user object returned by `_user_callback` or None
+        """
+        if self._user_callback_is_async:
             user = await self._user_callback(identifier)
         else:
-            user = await run_sync(self._user_callback, identifier)
+            # limiter=None uses the default thread pool of anyio
+            user = await run_sync(
+                self._user_callback, identifier, limiter=self._user_thread_limiter
+            )
+
+        # None is not cached, so users which are created later are found
+        cache = self._user_cache
+        if cache is not None and user is not None:
+            cache.set(identifier, user, cache.timer() + self._user_cache_ttl)
 
         return user
 
+    def _create_claims(
+        self,
+        data: dict,
+        expires: Optional[timedelta],
+        scopes: Optional[Collection[str]],
+    ) -> Dict[str, Any]:
+        """
+        Returns the claims of a new access token, see `create_access_token`
+        """
+        to_encode = data.copy()
+        expiry = expires if expires else self.default_expiry
+
+        # Integer arithmetic on microseconds yields the same value as PyJWT's conversion
+        # of `datetime.now(timezone.utc) + expiry`, without creating a datetime object
+        expiry_us = (
+            expiry.days * 86400 + expiry.seconds
+        ) * 1_000_000 + expiry.microseconds
+        to_encode.update({"exp": (time.time_ns() // 1000 + expiry_us) // 1_000_000})
+
+        if scopes is not None:
+            if self._scope_bits is not None:
+                to_encode[SCOPE_BITS_CLAIM] = self._scope_mask(scopes)
+            else:
+                unique_scopes = set(scopes)
+                to_encode.update({"scopes": list(unique_scopes)})
+
+        # unique id, which allows revoking the token
+        to_encode.setdefault("jti", secrets.token_urlsafe(16))
+
+        return to_encode
+
+    def _get_encoder(self) -> TokenEncoder:
+        """
+        Returns the encoder for the current secret, or the current key of the keyring
+        """
+        if self.keyring is not None:
+            key = self.keyring.current
+            secret = key.secret.secret_for_encode
+            algorithm = key.algorithm
+            headers: Optional[Dict[str, str]] = {"kid": key.kid}
+        else:
+            secret = self.secret.secret_for_encode
+            algorithm = self.algorithm
+            headers = None
+
+        encoder = self._encoder
+        if (
+            encoder is None
+            or encoder.key is not secret
+            or encoder.algorithm != algorithm
+            or encoder.headers != headers
+        ):
+            # (re)built lazily, so changes of `secret`, `algorithm`
+            # or the current key of the keyring are picked up
+            encoder = self._encoder = TokenEncoder(secret, algorithm, headers)
+
+        return encoder
+
     def create_access_token(
         self,
         *,
@@ -274,6 +1002,39 @@ class LoginManager(OAuth2PasswordBearer):
         Helper function to create the encoded access token using
         the provided secret and the algorithm of the LoginManager instance
 
+        Args:
+            data (dict): The data which should be stored in the token
+            expires (datetime.timedelta):  An optional timedelta in which the token expires.
+                Defaults to 15 minutes
+            scopes (Collection): Optional scopes the token user has access to.
+
+        Returns:
+            The encoded JWT with the data and the expiry. The expiry is
+            available under the 'exp' key. Unless `data` contains a `jti` key,
+            the token also carries a random `jti` claim, so that it can be revoked
+            using `revoke`. Tokens created with the same data are therefore never equal
+        """
+        return self._get_encoder().encode(self._create_claims(data, expires, scopes))
+
+    async def acreate_access_token(
+        self,
+        *,
+        data: dict,
+        expires: Optional[timedelta] = None,
+        scopes: Optional[Collection[str]] = None,
+    ) -> str:
+        """
+        Asynchronous version of `create_access_token`, which signs the token
+        in a worker thread, or in `signing_executor` if set, instead of blocking
+        the event loop. At most `signing_concurrency` tokens are signed at the same time.
+
+        Basic usage:
+
+            >>> @app.post("/auth/token")
+            >>> async def login(data: OAuth2PasswordRequestForm = Depends()):
+            ...     ...
+            ...     token = await manager.acreate_access_token(data={"sub": user.email})
+
         Args:
             data (dict): The data which should be stored in the token
             expires (datetime.timedelta):  An optional timedelta in which the token expires.
@@ -284,21 +1045,245 @@ class LoginManager(OAuth2PasswordBearer):
             The encoded JWT with the data and the expiry. The expiry is
             available under the 'exp' key
         """
+        # The expiry is computed before waiting for a free slot
+        return await self._encode_async(self._create_claims(data, expires, scopes))
 
-        to_encode = data.copy()
+    async def _encode_async(self, payload: Dict[str, Any]) -> str:
+        """
+        Signs the payload in a worker thread or `signing_executor`,
+        see `acreate_access_token`
+        """
+        encoder = self._get_encoder()
 
-        if expires:
-            expires_in = datetime.now(timezone.utc) + expires
-        else:
-            expires_in = datetime.now(timezone.utc) + self.default_expiry
+        if self._signing_limiter is None:
+            self._signing_limiter = anyio.CapacityLimiter(self._signing_concurrency)
 
-        to_encode.update({"exp": expires_in})
+        if self._signing_executor is None:
+            return await run_sync(
+                encoder.encode, payload, limiter=self._signing_limiter
+            )
 
-        if scopes is not None:
-            unique_scopes = set(scopes)
-            to_encode.update({"scopes": list(unique_scopes)})
+        # The limiter bounds the number of tokens queued in the executor
+        async with self._signing_limiter:
+            tokens = await aencode_tokens(encoder, [payload], self._signing_executor)
+        return tokens[0]
 
-        return jwt.encode(to_encode, self.secret.secret_for_encode, self.algorithm)
+    def _create_refresh_claims(
+        self,
+        data: dict,
+        expires: Optional[timedelta],
+        scopes: Optional[Collection[str]],
+        family: str,
+    ) -> Tuple[Dict[str, Any], RefreshRecord]:
+        """
+        Returns the claims of a new refresh token and the record which is stored for it
+        """
+        claims = self._create_claims(
+            data, expires if expires else DEFAULT_REFRESH_EXPIRY, scopes
+        )
+        claims[TOKEN_TYPE_CLAIM] = REFRESH_TOKEN_TYPE
+        claims["fam"] = family
+        return claims, RefreshRecord(claims["jti"], family, claims["exp"])
+
+    def create_refresh_token(
+        self,
+        *,
+        data: dict,
+        expires: Optional[timedelta] = None,
+        scopes: Optional[Collection[str]] = None,
+    ) -> str:
+        """
+        Creates a long-lived refresh token, which can be exchanged for a new
+        access token using `exchange_refresh_token`. Refresh tokens are not
+        accepted in place of access tokens.
+
+        Args:
+            data (dict): The data which is stored in the access tokens issued for this refresh token,
+                the user identifier should be stored under the `sub` key
+            expires (datetime.timedelta): An optional timedelta in which the token expires.
+                Defaults to 14 days
+            scopes (Collection): Optional scopes of the access tokens issued for this refresh token
+
+        Returns:
+            The encoded refresh token
+        """
+        claims, record = self._create_refresh_claims(
+            data, expires, scopes, secrets.token_urlsafe(16)
+        )
+        token = self._get_encoder().encode(claims)
+        self.refresh_store.add(record)
+        return token
+
+    async def exchange_refresh_token(
+        self,
+        token: str,
+        *,
+        expires: Optional[timedelta] = None,
+        refresh_expires: Optional[timedelta] = None,
+        load_user: bool = False,
+    ) -> TokenPair:
+        """
+        Exchanges the refresh token for a new access token and a new refresh token.
+        Every refresh token can only be used once. If a refresh token is used a second time,
+        it has most likely been stolen and all refresh tokens descending from the same
+        login are revoked.
+
+        Basic usage:
+
+            >>> @app.post("/auth/refresh")
+            >>> async def refresh(refresh_token: str = Body(..., embed=True)):
+            ...     access_token, refresh_token = await manager.exchange_refresh_token(refresh_token)
+            ...     return {"access_token": access_token, "refresh_token": refresh_token}
+
+        Args:
+            token (str): The refresh token
+            expires (datetime.timedelta): Expiry of the new access token, see `create_access_token`
+            refresh_expires (datetime.timedelta): Expiry of the new refresh token, see `create_refresh_token`
+            load_user (bool): If True, the exchange is only successful if `_user_callback`
+                still returns a user for the `sub` claim. By default the claims of the refresh
+                token are copied to the access token without loading the user
+
+        Returns:
+            The new access token and refresh token
+
+        Raises:
+            LoginManager.not_authenticated_exception: The refresh token is invalid, expired or has been used before
+        """
+        try:
+            payload, _ = self._decode_token(token)
+        except jwt.PyJWTError:
+            raise self.not_authenticated_exception
+
+        jti = payload.get("jti")
+        family = payload.get("fam")
+        if (
+            payload.get(TOKEN_TYPE_CLAIM) != REFRESH_TOKEN_TYPE
+            or not isinstance(jti, str)
+            or not isinstance(family, str)
+            # revoked using `revoke`, instead of `revoke_refresh_token`
+            or self.is_revoked(jti)
+        ):
+            raise self.not_authenticated_exception
+
+        # Everything which can fail is done before the token is consumed,
+        # otherwise a retry of the client would be taken for a reuse
+        if load_user:
+            await self._get_current_user(payload)
+
+        data = {
+            key: value
+            for key, value in payload.items()
+            if key not in REFRESH_ONLY_CLAIMS
+        }
+        scopes = payload.get("scopes")
+        refresh_claims, refresh_record = self._create_refresh_claims(
+            data, refresh_expires, scopes, family
+        )
+        access_token = await self._encode_async(
+            self._create_claims(data, expires, scopes)
+        )
+        refresh_token = await self._encode_async(refresh_claims)
+
+        record = self.refresh_store.consume(jti)
+        if record is None:
+            raise self.not_authenticated_exception
+        if record.used:
+            self.refresh_store.revoke_family(family)
+            raise self.not_authenticated_exception
+
+        self.refresh_store.add(refresh_record)
+        return TokenPair(access_token, refresh_token)
+
+    def revoke_refresh_token(self, token: str) -> None:
+        """
+        Revokes the refresh token and all refresh tokens issued by rotating it,
+        e.g. when the user logs out
+
+        Args:
+            token (str): The refresh token
+
+        Raises:
+            LoginManager.not_authenticated_exception: The token is not a valid refresh token
+        """
+        try:
+            payload, _ = self._decode_token(token)
+        except jwt.ExpiredSignatureError:
+            # Expired tokens are rejected anyway
+            return
+        except jwt.PyJWTError:
+            raise self.not_authenticated_exception
+
+        family = payload.get("fam")
+        if payload.get(TOKEN_TYPE_CLAIM) != REFRESH_TOKEN_TYPE or not isinstance(
+            family, str
+        ):
+            raise self.not_authenticated_exception
+
+        self.refresh_store.revoke_family(family)
+
+    def create_access_tokens(
+        self,
+        items: Iterable[dict],
+        *,
+        expires: Optional[timedelta] = None,
+        scopes: Optional[Collection[str]] = None,
+        executor: Optional[Executor] = None,
+        chunk_size: int = 256,
+    ) -> List[str]:
+        """
+        Creates an access token for each of the given claim sets.
+        The tokens are signed in the given thread or process pool,
+        which spreads the signing of many RS256 tokens over multiple cores.
+
+        Basic usage:
+
+            >>> from concurrent.futures import ProcessPoolExecutor
+            >>> with ProcessPoolExecutor() as pool:
+            ...     tokens = manager.create_access_tokens(
+            ...         [{"sub": device_id} for device_id in device_ids], executor=pool
+            ...     )
+
+        Args:
+            items (Iterable[dict]): The data stored in each of the tokens
+            expires (datetime.timedelta): See `create_access_token`
+            scopes (Collection): See `create_access_token`, the same scopes are used for all tokens
+            executor (concurrent.futures.Executor): Optional thread or process pool
+                used to sign the tokens, by default the tokens are signed in the calling thread
+            chunk_size (int): Number of tokens signed per task submitted to the executor
+
+        Returns:
+            The encoded tokens, in the same order as items
+        """
+        payloads = [self._create_claims(data, expires, scopes) for data in items]
+        return encode_tokens(self._get_encoder(), payloads, executor, chunk_size)
+
+    def iter_access_tokens(
+        self,
+        items: Iterable[dict],
+        *,
+        expires: Optional[timedelta] = None,
+        scopes: Optional[Collection[str]] = None,
+        executor: Optional[Executor] = None,
+        chunk_size: int = 256,
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Streaming variant of `create_access_tokens`, which yields the tokens as soon
+        as they have been signed. When an executor is used, the tokens are not
+        necessarily yielded in the order of items.
+
+        Args:
+            items (Iterable[dict]): The data stored in each of the tokens
+            expires (datetime.timedelta): See `create_access_token`
+            scopes (Collection): See `create_access_token`, the same scopes are used for all tokens
+            executor (concurrent.futures.Executor): Optional thread or process pool
+                used to sign the tokens
+            chunk_size (int): Number of tokens signed per task submitted to the executor
+
+        Yields:
+            Tuples containing the index of the claim set in items and its encoded token
+        """
+        payloads = [self._create_claims(data, expires, scopes) for data in items]
+        return iter_encode_tokens(self._get_encoder(), payloads, executor, chunk_size)
 
     def set_cookie(self, response: Response, token: str) -> None:
         """
@@ -335,17 +1320,162 @@ class LoginManager(OAuth2PasswordBearer):
         Raises:
             LoginManager.not_authenticated_exception if no token is present
         """
-        token = None
-        if self.use_cookie:
-            token = self._token_from_cookie(request)
+        metrics = self.metrics
+        start = time.perf_counter() if metrics is not None else 0.0
+        try:
+            token = None
+            if self.use_cookie:
+                token = self._token_from_cookie(request)
 
-        if not token and self.use_header:
-            token = await super(LoginManager, self).__call__(request)
+            if not token and self.use_header:
+                token = await super(LoginManager, self).__call__(request)
 
-        if not token:
-            raise self.not_authenticated_exception
+            if not token:
+                if metrics is not None:
+                    metrics.failure("missing_token")
+                raise self.not_authenticated_exception
 
-        return token
+            return token
+        finally:
+            if metrics is not None:
+                metrics.observe("token", time.perf_counter() - start)
+
+    def _memoized(self, scope: Optional[Dict[str, Any]]) -> Optional["_AuthResult"]:
+        """
+        Returns the result of the authentication of this request by this instance,
+        None if the request has not been authenticated yet
+
+        Args:
+            scope (Dict[str, Any]): The ASGI scope of the request
+        """
+        results = scope.get(_SCOPE_KEY) if scope is not None else None
+        if results is None:
+            return None
+        return results.get(self)
+
+    def _memoize(
+        self, scope: Optional[Dict[str, Any]], payload: Dict[str, Any]
+    ) -> "_AuthResult":
+        """
+        Stores the verified payload in the scope of the request, for the rest of the request
+        """
+        result = _AuthResult(payload)
+        if scope is not None:
+            # keyed by the instance, as multiple managers can authenticate the same request
+            scope.setdefault(_SCOPE_KEY, {})[self] = result
+        return result
+
+    async def _resolve_user(self, result: "_AuthResult") -> Any:
+        """
+        Returns the user of the memoized result, loading it on first use
+
+        Raises:
+            LoginManager.not_authenticated_exception: No user was found
+        """
+        if not result.user_loaded:
+            result.user = await self._get_current_user(result.payload)
+            result.user_loaded = True
+        return result.user
+
+    def _rate_limit_keys(
+        self, client: Optional[Tuple[str, int]], username: Any = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Returns the keys of the rate limiter for a client address and a submitted username.
+        Failed logins are counted under their own namespace, so that guessing the password
+        of a user never blocks the tokens the user already holds
+        """
+        keys = []
+        if client is not None:
+            keys.append(("ip", client[0]))
+        if username is not None:
+            keys.append(("login", str(username)))
+        return keys
+
+    def _over_rate_limit(self, keys: Iterable[Tuple[str, str]]) -> Optional[float]:
+        """
+        Returns the seconds until the first key over its limit is allowed again,
+        None if no key is over its limit
+        """
+        limiter = self.rate_limiter
+        for key in keys:
+            if not limiter.allowed(key):
+                if self.metrics is not None:
+                    self.metrics.failure("rate_limited")
+                return limiter.retry_after(key)
+        return None
+
+    def _check_rate_limit(self, keys: Iterable[Tuple[str, str]]) -> None:
+        retry_after = self._over_rate_limit(keys)
+        if retry_after is None:
+            return
+
+        exception = self._rate_limit_exception
+        if isinstance(exception, HTTPException):
+            # a copy, as the configured instance is shared by all requests
+            raise HTTPException(
+                exception.status_code,
+                exception.detail,
+                headers={
+                    **(exception.headers or {}),
+                    "Retry-After": str(math.ceil(retry_after)),
+                },
+            )
+        raise exception
+
+    def _count_failure(
+        self,
+        keys: Iterable[Tuple[str, str]],
+        error: Exception,
+        scope: Optional[Dict[str, Any]],
+    ) -> None:
+        # Only rejected credentials count, not e.g. errors of the user loader
+        exception = self._not_authenticated_exception
+        if not (
+            error is exception
+            or (isinstance(exception, type) and isinstance(error, exception))
+        ):
+            return
+
+        if scope is not None:
+            # the middleware and the dependency count a request only once
+            counted = scope.setdefault(_RATE_LIMITED_KEY, set())
+            if self in counted:
+                return
+            counted.add(self)
+        for key in keys:
+            self.rate_limiter.hit(key)
+
+    def check_rate_limit(self, request: Request, username: Any = None) -> None:
+        """
+        Rejects the request if its client ip or the username has exceeded the limit of
+        failed attempts of `rate_limiter`. Does nothing if no rate limiter is set.
+        Use it in the login route before checking the credentials.
+
+        Args:
+            request (fastapi.Request): The incoming request
+            username (Any): The submitted username
+
+        Raises:
+            LoginManager.rate_limit_exception: The client or the username is over the limit.
+                If it is an `HTTPException`, a copy with a `Retry-After` header is raised
+        """
+        if self.rate_limiter is not None:
+            self._check_rate_limit(self._rate_limit_keys(request.client, username))
+
+    def count_failed_attempt(self, request: Request, username: Any = None) -> None:
+        """
+        Counts a failed login against the client ip of the request and the username.
+        Does nothing if no rate limiter is set
+
+        Args:
+            request (fastapi.Request): The incoming request
+            username (Any): The submitted username
+        """
+        limiter = self.rate_limiter
+        if limiter is not None:
+            for key in self._rate_limit_keys(request.client, username):
+                limiter.hit(key)
 
     async def __call__(
         self,
@@ -366,13 +1496,39 @@ class LoginManager(OAuth2PasswordBearer):
             LoginManager.not_authenticated_exception: If set by the user and `self.auto_error` is set to False
 
         """
-        token = await self._get_token(request)
-        payload = self._get_payload(token)
-
-        if not self._has_scopes(payload, security_scopes):
+        # The token of the request might already have been verified by the middleware
+        # or by another dependency, in this case only the scopes are checked
+        # objects only mimicking a request are not memoized
+        scope = request.scope if isinstance(request, HTTPConnection) else None
+        # keys of the rate limiter, only set if the token is verified by this call
+        limit_keys = None
+        result = self._memoized(scope)
+        if result is None:
+            token = await self._get_token(request)
+            if self.rate_limiter is not None:
+                if scope is not None and self in scope.get(_RATE_LIMITED_KEY, ()):
+                    # the token has already been rejected earlier in this request
+                    raise self.not_authenticated_exception
+                limit_keys = self._rate_limit_keys(request.client)
+                self._check_rate_limit(limit_keys)
+            try:
+                payload = self._get_payload(token)
+            except Exception as e:
+                if limit_keys is not None:
+                    self._count_failure(limit_keys, e, scope)
+                raise
+            result = self._memoize(scope, payload)
+
+        if not self._has_scopes(result.payload, security_scopes):
             raise self._out_of_scope_exception
 
-        return await self._get_current_user(payload)
+        if limit_keys is None:
+            return await self._resolve_user(result)
+        try:
+            return await self._resolve_user(result)
+        except Exception as e:
+            self._count_failure(limit_keys, e, scope)
+            raise
 
     async def optional(self, request: Request, security_scopes: SecurityScopes = None):  # type: ignore
         """
@@ -385,25 +1541,15 @@ class LoginManager(OAuth2PasswordBearer):
         else:
             return user
 
-    def attach_middleware(self, app: FastAPI):
+    def attach_middleware(self, app: FastAPI, lazy: bool = False):
         """
         Add the instance as a middleware, which adds the user object, if present,
         to the request state
 
         Args:
             app (fastapi.FastAPI): FastAPI application
+            lazy (bool): If True, `request.state.user` is an awaitable which only
+                decodes the token and loads the user when it is awaited for the first time.
+                Use `user = await request.state.user` to get the user object
         """
-
-        async def __set_user(request: Request, call_next):
-            try:
-                request.state.user = await self.__call__(request)
-            except Exception:
-                # An error occurred while getting the user
-                # as middlewares are called for every incoming request
-                # it's not a good idea to return the Exception
-                # so we set the user to None
-                request.state.user = None
-
-            return await call_next(request)
-
-        app.add_middleware(BaseHTTPMiddleware, dispatch=__set_user)
+        app.add_middleware(LoginMiddleware, manager=self, lazy=lazy)
@@ -0,0 +1,156 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Union
+
+from .secrets import load_secret
+
+
+class RingKey(NamedTuple):
+    kid: str
+    secret: Any
+    algorithm: str
+    # Timestamp after which the key is no longer accepted, None if the key is active
+    not_after: Optional[float] = None
+
+
+class KeyRing:
+    """
+    A set of signing keys identified by their key id (`kid`).
+
+    New tokens are signed using the current key and carry its `kid` in the header,
+    incoming tokens are verified using the key referenced by their `kid` header.
+    Retired keys can no longer sign tokens, but still verify them until their cutoff.
+
+    Basic usage:
+
+        >>> keyring = KeyRing()
+        >>> keyring.add("2024-01", OLD_SECRET)
+        >>> keyring.add("2024-06", NEW_SECRET)  # becomes the current key
+        >>> keyring.retire("2024-01", verify_until=timedelta(hours=1))
+        >>> manager = LoginManager(keyring, token_url="/auth/token")
+    """
+
+    def __init__(self, fallback_kid: Optional[str] = None) -> None:
+        """
+        Args:
+            fallback_kid (str): The key used to verify tokens without a `kid` header,
+                e.g. tokens issued before the keyring was introduced.
+                By default such tokens are rejected
+        """
+        self.fallback_kid = fallback_kid
+        self.current_kid: Optional[str] = None
+        self._keys: Dict[str, RingKey] = {}
+        # updated together with the keys, read on every verified token
+        self._algorithms: FrozenSet[str] = frozenset()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, kid: str) -> bool:
+        return kid in self._keys
+
+    def add(
+        self,
+        kid: str,
+        secret: Any,
+        algorithm: str = "HS256",
+        current: bool = True,
+    ) -> None:
+        """
+        Adds a key to the keyring
+
+        Args:
+            kid (str): The key id, stored in the header of the tokens signed by this key
+            secret (Any): The secret, accepts the same values as `LoginManager`
+            algorithm (str): The algorithm used with this key, defaults to "HS256"
+            current (bool): If True, the key is used to sign new tokens from now on.
+                The first key added is always the current key
+        """
+        if isinstance(secret, str):
+            secret = secret.encode()
+
+        self._keys[kid] = RingKey(
+            kid, load_secret({"algorithms": algorithm, "secret": secret}), algorithm
+        )
+        self._algorithms = frozenset(key.algorithm for key in self._keys.values())
+        if current or self.current_kid is None:
+            self.current_kid = kid
+
+    def retire(
+        self, kid: str, verify_until: Union[datetime, timedelta, None] = None
+    ) -> None:
+        """
+        Stops the key from verifying tokens after the given cutoff
+
+        Args:
+            kid (str): The id of the key to retire
+            verify_until (datetime.datetime or datetime.timedelta): Point in time,
+                or time from now, until which tokens signed by this key are still accepted.
+                Defaults to now, which stops accepting them immediately
+
+        Raises:
+            KeyError: The key is not part of the keyring
+            ValueError: The key is the current key
+        """
+        if kid == self.current_kid:
+            raise ValueError("The current key can not be retired")
+
+        if verify_until is None:
+            not_after = time.time()
+        elif isinstance(verify_until, timedelta):
+            not_after = time.time() + verify_until.total_seconds()
+        else:
+            not_after = verify_until.timestamp()
+
+        self._keys[kid] = self._keys[kid]._replace(not_after=not_after)
+
+    def remove(self, kid: str) -> None:
+        """
+        Removes a key from the keyring
+
+        Raises:
+            KeyError: The key is not part of the keyring
+            ValueError: The key is the current key
+        """
+        if kid == self.current_kid:
+            raise ValueError("The current key can not be removed")
+        del self._keys[kid]
+        self._algorithms = frozenset(key.algorithm for key in self._keys.values())
+
+    @property
+    def current(self) -> RingKey:
+        """
+        The key used to sign new tokens
+        """
+        if self.current_kid is None:
+            raise LookupError("The keyring does not contain any keys")
+        return self._keys[self.current_kid]
+
+    @property
+    def algorithms(self) -> FrozenSet[str]:
+        """
+        The algorithms of all keys in the keyring, including retired keys
+        """
+        return self._algorithms
+
+    def get(self, kid: Optional[str]) -> Optional[RingKey]:
+        """
+        Returns the key which verifies tokens with the given `kid` header
+
+        Args:
+            kid (str): The `kid` header of the token, None if it is not set
+
+        Returns:
+            The key or None if the key is unknown or has been retired
+        """
+        if kid is None:
+            kid = self.fallback_kid
+        if not isinstance(kid, str):
+            return None
+
+        key = self._keys.get(kid)
+        if key is None:
+            return None
+        if key.not_after is not None and key.not_after <= time.time():
+            return None
+        return key
@@ -0,0 +1,179 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+# Stages of the authentication of a request, in the order they are passed
+STAGES = ("token", "payload", "scopes", "user")
+
+# Reasons for which a request is rejected
+FAILURE_REASONS = (
+    "missing_token",
+    "bad_signature",
+    "expired",
+    "invalid_token",
+    "revoked",
+    "scope",
+    "unknown_user",
+    "rate_limited",
+)
+
+# Upper bounds in seconds, from 10 microseconds to 1 second
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed bucket bounds, the same as a Prometheus histogram
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # The last bucket counts the values above the largest bound
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Dict[str, int]:
+        """
+        Returns:
+            The number of values less than or equal to each bound, keyed by the bound
+        """
+        result = {}
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result[repr(bound)] = total
+        result["+Inf"] = self.count
+        return result
+
+
+class AuthMetrics:
+    """
+    Counters and latency histograms of the authentication stages of a `LoginManager`:
+    extracting the token (`token`), verifying it (`payload`), checking the scopes (`scopes`)
+    and loading the user (`user`). Rejected requests are counted by reason.
+
+    Basic usage:
+
+        >>> metrics = AuthMetrics()
+        >>> manager = LoginManager(SECRET, "/auth/token", metrics=metrics)
+        >>> @app.get("/metrics", response_class=PlainTextResponse)
+        ... def export_metrics():
+        ...     return metrics.render_prometheus()
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Args:
+            buckets (Sequence[float]): Upper bounds of the histogram buckets in seconds
+        """
+        self._lock = threading.Lock()
+        self._histograms = {stage: Histogram(buckets) for stage in STAGES}
+        self._failures = dict.fromkeys(FAILURE_REASONS, 0)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Records the duration of a stage
+
+        Args:
+            stage (str): One of `fastapi_login.metrics.STAGES`
+            seconds (float): The duration of the stage
+        """
+        with self._lock:
+            self._histograms[stage].observe(seconds)
+
+    def failure(self, reason: str) -> None:
+        """
+        Counts a rejected request
+
+        Args:
+            reason (str): One of `fastapi_login.metrics.FAILURE_REASONS`
+        """
+        with self._lock:
+            self._failures[reason] += 1
+
+    def reset(self) -> None:
+        """
+        Sets all counters and histograms back to zero
+        """
+        with self._lock:
+            buckets = self._histograms[STAGES[0]].buckets
+            self._histograms = {stage: Histogram(buckets) for stage in STAGES}
+            self._failures = dict.fromkeys(FAILURE_REASONS, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            A copy of the current values, e.g.
+            `{"stages": {"payload": {"count": 1, "sum": 0.0001, "buckets": {...}}, ...},
+            "failures": {"expired": 0, ...}}`
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    stage: {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": histogram.cumulative(),
+                    }
+                    for stage, histogram in self._histograms.items()
+                },
+                "failures": dict(self._failures),
+            }
+
+    def render_prometheus(
+        self, prefix: str = "fastapi_login", snapshot: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format
+
+        Args:
+            prefix (str): Prefix of the metric names
+            snapshot (dict): A result of `snapshot`, defaults to the current values
+
+        Returns:
+            The metrics, ready to be served with the content type `text/plain; version=0.0.4`
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+
+        name = f"{prefix}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Duration of the authentication stages.",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, values in snapshot["stages"].items():
+            for bound, count in values["buckets"].items():
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {values["sum"]!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {values["count"]}')
+
+        name = f"{prefix}_failures_total"
+        lines.append(f"# HELP {name} Rejected authentication attempts by reason.")
+        lines.append(f"# TYPE {name} counter")
+        for reason, count in snapshot["failures"].items():
+            lines.append(f'{name}{{reason="{reason}"}} {count}')
+
+        return "\n".join(lines) + "\n"
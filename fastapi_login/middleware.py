@@ -0,0 +1,185 @@
+import time
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+import anyio
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .fastapi_login import LoginManager
+
+
+def _auth_headers(scope: Scope) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+    Returns the raw `Authorization` and `Cookie` headers of the ASGI scope
+    """
+    authorization = cookie = None
+    for name, value in scope["headers"]:
+        # only the first occurrence of a header is used, same as `Request.headers`
+        if name == b"authorization":
+            if authorization is None:
+                authorization = value
+        elif name == b"cookie":
+            if cookie is None:
+                cookie = value
+    return authorization, cookie
+
+
+def token_from_scope(manager: "LoginManager", scope: Scope) -> Optional[str]:
+    """
+    Extracts the token from the raw headers of an ASGI scope, following the same
+    rules as `LoginManager._get_token`, without building a `Request` object
+
+    Args:
+        manager (LoginManager): The manager whose configuration is used
+        scope (starlette.types.Scope): The ASGI connection scope
+
+    Returns:
+        The encoded JWT or None if no token is present
+    """
+    authorization, cookie = _auth_headers(scope)
+
+    if manager.use_cookie and cookie is not None:
+        # Avoid parsing the cookies if ours is not present at all
+        if manager.cookie_name.encode("latin-1") in cookie:
+            token = cookie_parser(cookie.decode("latin-1")).get(manager.cookie_name)
+            if token:
+                return token
+
+    if manager.use_header and authorization is not None:
+        scheme, _, param = authorization.decode("latin-1").partition(" ")
+        if scheme.lower() == "bearer":
+            return param.strip() or None
+
+    return None
+
+
+async def user_from_scope(manager: "LoginManager", scope: Scope) -> Any:
+    """
+    Returns the user object of the ASGI connection or None if no (valid) token is present
+
+    Args:
+        manager (LoginManager): The manager used to authenticate the connection
+        scope (starlette.types.Scope): The ASGI connection scope
+    """
+    # Reuse the result if the connection has already been authenticated
+    result = manager._memoized(scope)
+    limit_keys = None
+    if result is None:
+        metrics = manager.metrics
+        if metrics is None:
+            token = token_from_scope(manager, scope)
+        else:
+            start = time.perf_counter()
+            token = token_from_scope(manager, scope)
+            # A missing token is not counted as failure, anonymous requests are allowed
+            metrics.observe("token", time.perf_counter() - start)
+
+        if token is None:
+            return None
+
+        if manager.rate_limiter is not None:
+            limit_keys = manager._rate_limit_keys(scope.get("client"))
+            # Clients over the limit are treated as anonymous, without decoding their token
+            if manager._over_rate_limit(limit_keys) is not None:
+                return None
+
+    try:
+        if result is None:
+            result = manager._memoize(scope, manager._get_payload(token))
+        return await manager._resolve_user(result)
+    except Exception as e:
+        if limit_keys is not None:
+            manager._count_failure(limit_keys, e, scope)
+        # As middlewares are called for every incoming request
+        # it's not a good idea to return the Exception
+        # so we set the user to None
+        return None
+
+
+class LazyUser:
+    """
+    Awaitable placeholder for the user object of a request.
+    The token is only decoded and the user only loaded once it is awaited
+    for the first time, the result is kept for the rest of the request.
+
+    Usage:
+
+        >>> user = await request.state.user
+    """
+
+    __slots__ = ("_manager", "_scope", "_user", "_resolved", "_lock")
+
+    def __init__(self, manager: "LoginManager", scope: Scope) -> None:
+        self._manager = manager
+        self._scope = scope
+        self._user: Any = None
+        self._resolved = False
+        # only created once needed, most requests never await the user concurrently
+        self._lock: Optional[anyio.Lock] = None
+
+    @property
+    def resolved(self) -> bool:
+        """
+        True if the user has already been loaded
+        """
+        return self._resolved
+
+    async def get(self) -> Any:
+        """
+        Returns:
+            The user object or None if no (valid) token is present
+        """
+        if self._resolved:
+            return self._user
+
+        if self._lock is None:
+            self._lock = anyio.Lock()
+
+        async with self._lock:
+            if not self._resolved:
+                self._user = await user_from_scope(self._manager, self._scope)
+                self._resolved = True
+
+        return self._user
+
+    def __await__(self):
+        return self.get().__await__()
+
+
+class LoginMiddleware:
+    """
+    Pure ASGI middleware which stores the user object, or None if no (valid)
+    token is present, in the request state. Unlike a `BaseHTTPMiddleware` it
+    does not spawn an additional task or wrap the response stream.
+
+    Usually added using `LoginManager.attach_middleware`
+    """
+
+    def __init__(
+        self, app: ASGIApp, manager: "LoginManager", lazy: bool = False
+    ) -> None:
+        """
+        Args:
+            app (starlette.types.ASGIApp): The wrapped application
+            manager (LoginManager): The manager used to authenticate the requests
+            lazy (bool): If True, the request state holds a `LazyUser`
+                which only authenticates the request once it is awaited
+        """
+        self.app = app
+        self.manager = manager
+        self.lazy = lazy
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        if self.lazy:
+            user = LazyUser(self.manager, scope)
+        else:
+            user = await user_from_scope(self.manager, scope)
+
+        # `Request.state` is backed by this dictionary
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
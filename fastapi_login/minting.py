@@ -0,0 +1,180 @@
+import asyncio
+import functools
+import weakref
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import anyio
+
+from .codec import TokenEncoder
+from .secrets import load_secret
+
+
+def _chunks(
+    payloads: Sequence[Dict[str, Any]], chunk_size: int
+) -> List[Sequence[Dict[str, Any]]]:
+    return [payloads[i : i + chunk_size] for i in range(0, len(payloads), chunk_size)]
+
+
+def _serialize_key(key: Any) -> bytes:
+    """
+    Returns a picklable representation of the signing key
+    """
+    if isinstance(key, bytes):
+        return key
+
+    from cryptography.hazmat.primitives import serialization
+
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+# Key, algorithm and headers of an encoder, as passed to the worker processes
+_ProcessArgs = Tuple[bytes, str, Tuple[Tuple[str, str], ...]]
+
+# serialized once per encoder, the entries are dropped together with their encoder
+_process_args: "weakref.WeakKeyDictionary[TokenEncoder, _ProcessArgs]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _encoder_args(encoder: TokenEncoder) -> _ProcessArgs:
+    """
+    Returns the picklable key, algorithm and headers of the encoder
+    """
+    args = _process_args.get(encoder)
+    if args is None:
+        # Neither the encoder nor cryptography key objects can be pickled
+        args = _process_args[encoder] = (
+            _serialize_key(encoder.key),
+            encoder.algorithm,
+            tuple(sorted((encoder.headers or {}).items())),
+        )
+    return args
+
+
+@functools.lru_cache(maxsize=8)
+def _worker_encoder(
+    key: bytes, algorithm: str, headers: Tuple[Tuple[str, str], ...]
+) -> TokenEncoder:
+    # Every worker process parses the key only once
+    secret = load_secret({"algorithms": algorithm, "secret": key})
+    return TokenEncoder(secret.secret_for_encode, algorithm, dict(headers) or None)
+
+
+def _encode_chunk_in_process(
+    key: bytes,
+    algorithm: str,
+    headers: Tuple[Tuple[str, str], ...],
+    payloads: Sequence[Dict[str, Any]],
+) -> List[str]:
+    encoder = _worker_encoder(key, algorithm, headers)
+    return [encoder.encode(payload) for payload in payloads]
+
+
+def _encode_chunk(
+    encoder: TokenEncoder, payloads: Sequence[Dict[str, Any]]
+) -> List[str]:
+    return [encoder.encode(payload) for payload in payloads]
+
+
+def _submit_chunks(
+    encoder: TokenEncoder,
+    chunks: List[Sequence[Dict[str, Any]]],
+    executor: Executor,
+):
+    if isinstance(executor, ProcessPoolExecutor):
+        args = _encoder_args(encoder)
+        return [
+            executor.submit(_encode_chunk_in_process, *args, chunk) for chunk in chunks
+        ]
+
+    return [executor.submit(_encode_chunk, encoder, chunk) for chunk in chunks]
+
+
+async def aencode_tokens(
+    encoder: TokenEncoder,
+    payloads: Sequence[Dict[str, Any]],
+    executor: Executor,
+) -> List[str]:
+    """
+    Encodes all payloads as a single task of the executor, and waits for
+    the result without occupying a worker thread
+
+    Args:
+        encoder (TokenEncoder): The encoder used to sign the tokens
+        payloads (Sequence[Dict[str, Any]]): The claims of the tokens
+        executor (concurrent.futures.Executor): Thread or process pool to sign the tokens in
+
+    Returns:
+        The encoded tokens in the order of the payloads
+    """
+    (future,) = _submit_chunks(encoder, [payloads], executor)
+    return await _wait(future)
+
+
+async def _wait(future: "Future[List[str]]") -> List[str]:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Other event loops, e.g. trio, wait in a worker thread
+        return await anyio.to_thread.run_sync(future.result)
+    return await asyncio.wrap_future(future)
+
+
+def encode_tokens(
+    encoder: TokenEncoder,
+    payloads: Sequence[Dict[str, Any]],
+    executor: Optional[Executor] = None,
+    chunk_size: int = 256,
+) -> List[str]:
+    """
+    Encodes all payloads, using the executor if given
+
+    Args:
+        encoder (TokenEncoder): The encoder used to sign the tokens
+        payloads (Sequence[Dict[str, Any]]): The claims of the tokens
+        executor (concurrent.futures.Executor): Thread or process pool to sign the tokens in
+        chunk_size (int): Number of tokens signed per task submitted to the executor
+
+    Returns:
+        The encoded tokens in the order of the payloads
+    """
+    if executor is None:
+        return _encode_chunk(encoder, payloads)
+
+    futures = _submit_chunks(encoder, _chunks(payloads, chunk_size), executor)
+    return [token for future in futures for token in future.result()]
+
+
+def iter_encode_tokens(
+    encoder: TokenEncoder,
+    payloads: Sequence[Dict[str, Any]],
+    executor: Optional[Executor] = None,
+    chunk_size: int = 256,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Like `encode_tokens`, but yields the tokens as soon as their chunk has been signed
+
+    Yields:
+        Tuples of the index of the payload and its encoded token
+    """
+    if executor is None:
+        for index, payload in enumerate(payloads):
+            yield index, encoder.encode(payload)
+        return
+
+    futures = _submit_chunks(encoder, _chunks(payloads, chunk_size), executor)
+    offsets = {future: i * chunk_size for i, future in enumerate(futures)}
+    try:
+        for future in as_completed(futures):
+            offset = offsets[future]
+            for i, token in enumerate(future.result()):
+                yield offset + i, token
+    finally:
+        # the consumer stopped early
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,95 @@
+import binascii
+import json
+import time
+from typing import Any, Collection, Optional
+
+from .codec import _b64decode
+
+
+def _decode_segment(segment: str) -> Any:
+    """
+    Returns the JSON value of a token segment, None if it can not be decoded
+    """
+    try:
+        return json.loads(_b64decode(segment))
+    except (ValueError, binascii.Error, RecursionError):
+        return None
+
+
+class TokenPrecheck:
+    """
+    Structural checks which reject malformed tokens before their signature is verified.
+
+    The checks only look at the encoded token and its unverified header and payload,
+    they never accept a token, which is verified afterwards as usual.
+
+    Basic usage:
+
+        >>> manager = LoginManager(SECRET, "/auth/token", precheck=TokenPrecheck(max_length=2048))
+    """
+
+    def __init__(
+        self,
+        max_length: int = 4096,
+        check_header: bool = True,
+        allowed_types: Collection[str] = ("JWT",),
+        check_expiry: bool = True,
+    ) -> None:
+        """
+        Args:
+            max_length (int): Tokens longer than this are rejected, defaults to 4096 characters
+            check_header (bool): Reject tokens whose `alg` header is not used by the manager,
+                or whose `typ` header, if present, is not one of allowed_types
+            allowed_types (Collection[str]): Accepted values of the `typ` header
+            check_expiry (bool): Reject tokens whose unverified `exp` claim has passed
+        """
+        if max_length <= 0:
+            raise ValueError("max_length must be greater than 0")
+
+        self.max_length = max_length
+        self.check_header = check_header
+        self.allowed_types = frozenset(allowed_types)
+        self.check_expiry = check_expiry
+
+    def check(self, token: str, algorithms: Collection[str]) -> Optional[str]:
+        """
+        Args:
+            token (str): The encoded JWT
+            algorithms (Collection[str]): The algorithms the manager verifies tokens with
+
+        Returns:
+            None if the token passes the checks, otherwise the reason of the
+            rejection, as reported to `fastapi_login.metrics.AuthMetrics`
+        """
+        if len(token) > self.max_length or token.count(".") != 2:
+            return "invalid_token"
+
+        header_segment, payload_segment, _ = token.split(".")
+        if self.check_header:
+            header = _decode_segment(header_segment)
+            if not isinstance(header, dict):
+                return "invalid_token"
+            # the membership tests of sets raise TypeError for unhashable values
+            alg = header.get("alg")
+            if not isinstance(alg, str) or alg not in algorithms:
+                return "invalid_token"
+            typ = header.get("typ")
+            if typ is not None and (
+                not isinstance(typ, str) or typ not in self.allowed_types
+            ):
+                return "invalid_token"
+
+        if self.check_expiry:
+            payload = _decode_segment(payload_segment)
+            if not isinstance(payload, dict):
+                return "invalid_token"
+            exp = payload.get("exp")
+            # the same comparison as PyJWT without leeway
+            if (
+                isinstance(exp, (int, float))
+                and not isinstance(exp, bool)
+                and exp <= time.time()
+            ):
+                return "expired"
+
+        return None
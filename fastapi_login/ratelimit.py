@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, Tuple
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # key -> (tokens, time of the last update), ordered from least to most recently updated
+        self.buckets: Dict[Hashable, Tuple[float, float]] = {}
+
+
+class RateLimiter:
+    """
+    Token buckets limiting the rate of failed authentication attempts per key,
+    e.g. per client ip or per user.
+
+    Every failed attempt takes one token from the bucket of its key, the bucket refills
+    with `rate` tokens per second up to `burst` tokens. Attempts of a key whose bucket
+    holds less than one token are rejected. Buckets are only refilled when they are
+    accessed, and are spread over independently locked shards.
+
+    Basic usage:
+
+        >>> limiter = RateLimiter(rate=0.1, burst=10)
+        >>> manager = LoginManager(SECRET, "/auth/token", rate_limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.1,
+        burst: int = 10,
+        max_keys: int = 100_000,
+        shards: int = 16,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            rate (float): Tokens added to a bucket per second, defaults to one every 10 seconds
+            burst (int): Capacity of a bucket, the number of failed attempts accepted in a row
+            max_keys (int): Maximum number of buckets kept in memory. Once exceeded,
+                the least recently updated buckets are dropped
+            shards (int): Number of shards, each with its own lock
+            timer (Callable[[], float]): Monotonic clock returning seconds
+        """
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if shards < 1 or max_keys < shards:
+            raise ValueError("max_keys must be at least the number of shards")
+
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.timer = timer
+        self._shards = [_Shard() for _ in range(shards)]
+        self._shard_size = max_keys // shards
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def _shard(self, key: Hashable) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _tokens(self, bucket: Tuple[float, float], now: float) -> float:
+        tokens, updated = bucket
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def allowed(self, key: Hashable) -> bool:
+        """
+        Returns:
+            True if the key has not exceeded its limit, keys without a bucket are always allowed
+        """
+        bucket = self._shard(key).buckets.get(key)
+        return bucket is None or self._tokens(bucket, self.timer()) >= 1
+
+    def retry_after(self, key: Hashable) -> float:
+        """
+        Returns:
+            Seconds until the next attempt of the key is allowed, 0 if it is allowed now
+        """
+        bucket = self._shard(key).buckets.get(key)
+        if bucket is None:
+            return 0.0
+        return max(0.0, (1 - self._tokens(bucket, self.timer())) / self.rate)
+
+    def hit(self, key: Hashable) -> None:
+        """
+        Counts a failed attempt of the key
+        """
+        shard = self._shard(key)
+        now = self.timer()
+        with shard.lock:
+            buckets = shard.buckets
+            bucket = buckets.pop(key, None)
+            tokens = self.burst if bucket is None else self._tokens(bucket, now)
+            if len(buckets) >= self._shard_size:
+                # the oldest bucket is the one most likely to be full again
+                del buckets[next(iter(buckets))]
+            buckets[key] = (max(0.0, tokens - 1), now)
+
+    def reset(self, key: Hashable) -> None:
+        """
+        Removes the bucket of the key, e.g. after a successful login
+        """
+        shard = self._shard(key)
+        with shard.lock:
+            shard.buckets.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all buckets
+        """
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
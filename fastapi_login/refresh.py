@@ -0,0 +1,122 @@
+import heapq
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Claim which distinguishes refresh tokens from access tokens
+TOKEN_TYPE_CLAIM = "token_type"
+REFRESH_TOKEN_TYPE = "refresh"
+
+# Claims of a refresh token which are not copied to the access tokens issued for it
+REFRESH_ONLY_CLAIMS = frozenset(("exp", "jti", "fam", "scopes", TOKEN_TYPE_CLAIM))
+
+DEFAULT_REFRESH_EXPIRY = timedelta(days=14)
+
+
+class RefreshRecord(NamedTuple):
+    # The `jti` claim of the refresh token
+    jti: str
+    # Id shared by all refresh tokens issued by rotation of the same login
+    family: str
+    expires_at: float
+    used: bool = False
+
+
+class TokenPair(NamedTuple):
+    access_token: str
+    refresh_token: str
+
+
+class RefreshTokenStore(ABC):
+    """
+    Storage of the issued refresh tokens.
+
+    Subclasses have to implement `add`, `consume` and `revoke_family`.
+    The methods are called synchronously, `consume` has to be atomic.
+    """
+
+    @abstractmethod
+    def add(self, record: RefreshRecord) -> None:
+        """
+        Stores a newly issued refresh token
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def consume(self, jti: str) -> Optional[RefreshRecord]:
+        """
+        Marks the refresh token as used
+
+        Args:
+            jti (str): The `jti` claim of the refresh token
+
+        Returns:
+            The record as it was before this call, so `used` is True if
+            the token has been used before. None if the token is unknown
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def revoke_family(self, family: str) -> None:
+        """
+        Removes all refresh tokens of the family, none of them can be used afterwards
+        """
+        raise NotImplementedError
+
+
+class InMemoryRefreshStore(RefreshTokenStore):
+    """
+    Keeps the refresh tokens in the memory of the process. The tokens are lost on restart,
+    and are not shared between multiple worker processes.
+    """
+
+    def __init__(self, timer: Callable[[], float] = time.time) -> None:
+        """
+        Args:
+            timer (Callable[[], float]): Clock returning the current unix timestamp
+        """
+        self.timer = timer
+        self._lock = threading.Lock()
+        self._records: Dict[str, RefreshRecord] = {}
+        self._families: Dict[str, Set[str]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: RefreshRecord) -> None:
+        with self._lock:
+            self._purge(self.timer())
+            self._records[record.jti] = record
+            self._families.setdefault(record.family, set()).add(record.jti)
+            heapq.heappush(self._expiry_heap, (record.expires_at, record.jti))
+
+    def consume(self, jti: str) -> Optional[RefreshRecord]:
+        with self._lock:
+            record = self._records.get(jti)
+            if record is None or record.expires_at <= self.timer():
+                return None
+            if not record.used:
+                self._records[jti] = record._replace(used=True)
+            return record
+
+    def revoke_family(self, family: str) -> None:
+        with self._lock:
+            for jti in self._families.pop(family, ()):
+                self._records.pop(jti, None)
+
+    def _purge(self, now: float) -> None:
+        # Used tokens are kept until they expire, so that their reuse is detected
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, jti = heapq.heappop(heap)
+            record = self._records.pop(jti, None)
+            if record is None:
+                continue
+            family = self._families.get(record.family)
+            if family is not None:
+                family.discard(jti)
+                if not family:
+                    del self._families[record.family]
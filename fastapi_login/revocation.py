@@ -0,0 +1,162 @@
+import hashlib
+import heapq
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class BloomFilter:
+    """
+    Fixed size set membership filter without false negatives.
+
+    `might_contain` returning False guarantees that the item has never been added,
+    True means that the item has probably been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        """
+        Args:
+            capacity (int): Number of items after which the false positive rate exceeds error_rate
+            error_rate (float): Target false positive rate, between 0 and 1
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        # Double hashing: two 64 bit halves of one digest
+        # generate all positions, see Kirsch and Mitzenmacher
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        bits = self._bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, item: str) -> bool:
+        bits = self._bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationList:
+    """
+    Set of revoked token ids (`jti` claims).
+
+    Lookups are answered by a Bloom filter, the exact set of revoked ids is only
+    consulted if the filter reports a possible hit. Every id is kept until the
+    token it blocks would have expired anyway, the ids are removed in expiry order.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        error_rate: float = 0.001,
+        timer: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            capacity (int): Expected number of revoked, not yet expired tokens.
+                The filter is rebuilt with twice the capacity once it is exceeded
+            error_rate (float): False positive rate of the filter
+            timer (Callable[[], float]): Clock returning the current unix timestamp
+        """
+        self.error_rate = error_rate
+        self.timer = timer
+        self._lock = threading.Lock()
+        # jti -> expiry of the revoked token, None if it does not expire
+        self._revoked: Dict[str, Optional[float]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._filter = BloomFilter(capacity, error_rate)
+        # Items can not be removed from a Bloom filter,
+        # this counts the items added since it has been built
+        self._filter_items = 0
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def __contains__(self, jti: str) -> bool:
+        return self.is_revoked(jti)
+
+    def add(self, jti: str, expires_at: Optional[float] = None) -> None:
+        """
+        Revokes the token id
+
+        Args:
+            jti (str): The `jti` claim of the token
+            expires_at (float): Unix timestamp at which the token expires,
+                None if the token never expires
+        """
+        with self._lock:
+            now = self.timer()
+            self._purge(now)
+            if expires_at is not None and expires_at <= now:
+                # the token is rejected anyway
+                return
+            if jti in self._revoked:
+                return
+
+            self._revoked[jti] = expires_at
+            if expires_at is not None:
+                heapq.heappush(self._expiry_heap, (expires_at, jti))
+
+            if len(self._revoked) > self._filter.capacity:
+                self._rebuild(self._filter.capacity * 2)
+            else:
+                self._filter.add(jti)
+                self._filter_items += 1
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        Args:
+            jti (str): The `jti` claim of the token, tokens without a `jti` claim are never revoked
+
+        Returns:
+            True if the token id has been revoked
+        """
+        if not isinstance(jti, str) or not self._filter.might_contain(jti):
+            return False
+        return jti in self._revoked
+
+    def purge(self) -> None:
+        """
+        Removes the ids of tokens which have expired in the meantime
+        """
+        with self._lock:
+            self._purge(self.timer())
+
+    def _purge(self, now: float) -> None:
+        heap = self._expiry_heap
+        removed = False
+        while heap and heap[0][0] <= now:
+            _, jti = heapq.heappop(heap)
+            del self._revoked[jti]
+            removed = True
+
+        # Stale items raise the false positive rate, rebuild once they are the majority
+        if removed and self._filter_items > 2 * len(self._revoked):
+            self._rebuild(self._filter.capacity)
+
+    def _rebuild(self, capacity: int) -> None:
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._revoked:
+            bloom.add(jti)
+        self._filter_items = len(self._revoked)
+        # Replaced at once, so lookups without the lock always see a complete filter
+        self._filter = bloom
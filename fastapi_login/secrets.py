@@ -1,4 +1,6 @@
-from typing import Optional, Union
+import functools
+import importlib.util
+from typing import Any, Optional, Union
 
 from pydantic import BaseModel, Field, SecretBytes
 from typing_extensions import Annotated, Literal
@@ -14,13 +16,10 @@ except ImportError:  # pragma: no cover
         return validator(*args, pre=pre, **kwargs)
 
 
-try:
-    from cryptography.hazmat.backends import default_backend
-    from cryptography.hazmat.primitives import serialization
-except ImportError:  # pragma: no cover
-    _has_cryptography = False
-else:
-    _has_cryptography = True
+# cryptography is only imported by this module once an asymmetric secret is parsed.
+# This does not shorten the import of fastapi_login, as PyJWT imports cryptography
+# itself whenever it is installed, but keeps it out of the HS256 code paths
+_has_cryptography = importlib.util.find_spec("cryptography") is not None
 
 
 class RawPrivateSecret(BaseModel):
@@ -45,8 +44,44 @@ class AsymmetricSecretIn(BaseModel):
 
 
 class AsymmetricPairKey(BaseModel):
-    private_key: SecretBytes
-    public_key: SecretBytes
+    # Parsed cryptography key objects, these can be handed to PyJWT
+    # without being deserialized again on every encode or decode
+    private_key: Any
+    public_key: Any
+
+
+def _is_private_key(obj) -> bool:
+    return hasattr(obj, "public_key") and hasattr(obj, "private_bytes")
+
+
+def _deserialize_private_key(data: bytes, password: Optional[bytes]):
+    """
+    Loads a PEM or DER encoded private key
+    """
+    from cryptography.hazmat.primitives import serialization
+
+    try:
+        if data.lstrip().startswith(b"-----BEGIN"):
+            return serialization.load_pem_private_key(data, password)
+        return serialization.load_der_private_key(data, password)
+    except TypeError as e:
+        # raised on a password mismatch, pydantic only handles ValueErrors
+        raise ValueError(str(e))
+
+
+def _load_private_key(secret):
+    """
+    Returns the private key object for the given secret,
+    which is either a key object, PEM or DER encoded bytes or a dictionary
+    containing one of those under `private_key` and an optional `password`
+    """
+    if _is_private_key(secret):
+        return secret
+    if isinstance(secret, dict) and _is_private_key(secret.get("private_key")):
+        return secret["private_key"]
+
+    secret_in = AsymmetricSecretIn(data=secret)
+    return _deserialize_private_key(secret_in.private_key, secret_in.password)
 
 
 class AsymmetricSecret(BaseModel):
@@ -56,34 +91,69 @@ class AsymmetricSecret(BaseModel):
     @field_validator("secret", mode="before")
     @classmethod
     def secret_must_be_asymmetric_private_key(cls, secret):
-        secret_in = AsymmetricSecretIn(data=secret)
-        private_key = serialization.load_pem_private_key(
-            secret_in.private_key,
-            secret_in.password,
-            backend=default_backend(),
-        )
+        if isinstance(secret, AsymmetricPairKey):
+            return secret
 
-        private_key_pem_bytes = private_key.private_bytes(
-            serialization.Encoding.PEM,
-            serialization.PrivateFormat.PKCS8,
-            serialization.NoEncryption(),
-        )
-        public_key_pem_bytes = private_key.public_key().public_bytes(
-            serialization.Encoding.PEM,
-            serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
+        private_key = _load_private_key(secret)
+        cls._check_private_key(private_key)
 
         return AsymmetricPairKey(
-            private_key=private_key_pem_bytes, public_key=public_key_pem_bytes
+            private_key=private_key, public_key=private_key.public_key()
         )
 
+    @classmethod
+    def _check_private_key(cls, private_key) -> None:
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        if not isinstance(private_key, rsa.RSAPrivateKey):
+            raise ValueError("RS256 requires a RSA private key")
+
     @property
     def secret_for_decode(self):
-        return self.secret.public_key.get_secret_value()
+        return self.secret.public_key
 
     @property
     def secret_for_encode(self):
-        return self.secret.private_key.get_secret_value()
+        return self.secret.private_key
+
+
+def _check_ec_private_key(private_key, curve_name: str, algorithm: str) -> None:
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    curve = getattr(ec, curve_name)
+    if not isinstance(private_key, ec.EllipticCurvePrivateKey) or not isinstance(
+        private_key.curve, curve
+    ):
+        raise ValueError(f"{algorithm} requires a {curve.name} private key")
+
+
+class ES256Secret(AsymmetricSecret):
+    algorithms: Literal["ES256"] = "ES256"
+
+    @classmethod
+    def _check_private_key(cls, private_key) -> None:
+        _check_ec_private_key(private_key, "SECP256R1", "ES256")
+
+
+class ES384Secret(AsymmetricSecret):
+    algorithms: Literal["ES384"] = "ES384"
+
+    @classmethod
+    def _check_private_key(cls, private_key) -> None:
+        _check_ec_private_key(private_key, "SECP384R1", "ES384")
+
+
+class EdDSASecret(AsymmetricSecret):
+    algorithms: Literal["EdDSA"] = "EdDSA"
+
+    @classmethod
+    def _check_private_key(cls, private_key) -> None:
+        from cryptography.hazmat.primitives.asymmetric import ed448, ed25519
+
+        if not isinstance(
+            private_key, (ed25519.Ed25519PrivateKey, ed448.Ed448PrivateKey)
+        ):
+            raise ValueError("EdDSA requires a Ed25519 or Ed448 private key")
 
 
 class SymmetricSecret(BaseModel):
@@ -101,18 +171,68 @@ class SymmetricSecret(BaseModel):
 
 if _has_cryptography:
     Secret = Annotated[
-        Union[SymmetricSecret, AsymmetricSecret], Field(discriminator="algorithms")
+        Union[SymmetricSecret, AsymmetricSecret, ES256Secret, ES384Secret, EdDSASecret],
+        Field(discriminator="algorithms"),
     ]
 else:
     Secret = SymmetricSecret
 
 
-def to_secret(obj: dict):
+@functools.lru_cache(maxsize=None)
+def _secret_validator():
+    """
+    Returns the function validating secrets, building the validator only once
+    """
     try:
         from pydantic import TypeAdapter
 
-        return TypeAdapter(Secret).validate_python(obj)
+        return TypeAdapter(Secret).validate_python
     except ImportError:  # pragma: no cover
         from pydantic import parse_obj_as
 
-        return parse_obj_as(Secret, obj)
+        return functools.partial(parse_obj_as, Secret)
+
+
+def to_secret(obj: dict):
+    return _secret_validator()(obj)
+
+
+class ResolvedSecret:
+    """
+    Immutable holder of a validated secret, with the key material already resolved.
+    Reading `secret_for_decode` and `secret_for_encode` is a plain attribute access,
+    unlike the properties of the pydantic models which only validate the input.
+    """
+
+    __slots__ = ("algorithms", "secret_for_decode", "secret_for_encode")
+
+    def __init__(self, algorithms: str, secret_for_decode, secret_for_encode) -> None:
+        object.__setattr__(self, "algorithms", algorithms)
+        object.__setattr__(self, "secret_for_decode", secret_for_decode)
+        object.__setattr__(self, "secret_for_encode", secret_for_encode)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        # never include the key material
+        return f"{type(self).__name__}(algorithms={self.algorithms!r})"
+
+
+def load_secret(obj: dict) -> ResolvedSecret:
+    """
+    Validates the secret using `to_secret` and resolves its key material
+
+    Args:
+        obj (dict): `algorithms` and `secret`, as accepted by `to_secret`
+
+    Returns:
+        The resolved secret
+    """
+    secret = to_secret(obj)
+    return ResolvedSecret(
+        secret.algorithms, secret.secret_for_decode, secret.secret_for_encode
+    )
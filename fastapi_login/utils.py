@@ -1,4 +1,18 @@
 import functools
+import inspect
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+)
+
+import anyio
+import anyio.to_thread
 
 
 class ordered_partial(functools.partial):
@@ -16,3 +30,208 @@ class ordered_partial(functools.partial):
         # allow overwriting the declared keywords
         keywords = {**self.keywords, **keywords}
         return self.func(*args, *self.args, **keywords)
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "done")
+
+    def __init__(self):
+        self.event = anyio.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single call.
+    Every caller waiting on a key receives the result, or the exception,
+    of the call which is currently in flight for this key.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """
+        Awaits `fn(*args)` unless a call for key is already in flight,
+        in which case the result of that call is returned instead
+
+        Args:
+            key (Hashable): The key identifying the call
+            fn (Callable[..., Awaitable]): The coroutine function to call
+            args: Positional arguments passed to fn
+
+        Returns:
+            The result of the (shared) call
+        """
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                break
+
+            await call.event.wait()
+            if call.done:
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # The call in flight was cancelled, try again
+
+        call = _Call()
+        self._calls[key] = call
+        try:
+            call.result = await fn(*args)
+        except Exception as e:
+            call.error = e
+            call.done = True
+            raise
+        else:
+            call.done = True
+            return call.result
+        finally:
+            del self._calls[key]
+            call.event.set()
+
+
+class _Batch:
+    __slots__ = ("keys", "event", "results", "error", "dispatched", "cancelled")
+
+    def __init__(self):
+        # dict instead of a set to keep the order in which the keys were requested
+        self.keys: Dict[Hashable, None] = {}
+        self.event = anyio.Event()
+        self.results: Dict[Hashable, Any] = {}
+        self.error: Optional[BaseException] = None
+        self.dispatched = False
+        self.cancelled = False
+
+
+class BatchLoader:
+    """
+    Collects the keys requested during one event loop iteration, or a short time window,
+    and loads them with a single call of the batch function.
+
+    The batch function receives a list of unique keys and returns either a sequence
+    of values in the same order, or a mapping from key to value.
+    Missing keys resolve to None.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Hashable]], Any],
+        max_batch: int = 100,
+        window_ms: float = 0,
+        limiter: Optional[anyio.CapacityLimiter] = None,
+    ):
+        """
+        Args:
+            fn (Callable): Sync or async function loading a list of keys
+            max_batch (int): Maximum number of keys passed to fn at once,
+                a full batch is dispatched immediately
+            window_ms (float): Time in milliseconds to wait for more keys after the first one
+                was requested. Defaults to 0, which only waits for one event loop iteration
+            limiter (anyio.CapacityLimiter): Limits the threads running a sync fn,
+                defaults to the default thread pool of anyio
+        """
+        if max_batch <= 0:
+            raise ValueError("max_batch needs to be a positive integer")
+
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._fn = fn
+        self._is_async = inspect.iscoroutinefunction(fn)
+        self._limiter = limiter
+        self._batch: Optional[_Batch] = None
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Queues key for the next batch and waits for its result
+
+        Args:
+            key (Hashable): The key to load
+
+        Returns:
+            The value returned by the batch function for this key
+        """
+        while True:
+            batch = self._batch
+            is_leader = batch is None
+            if batch is None:
+                batch = self._batch = _Batch()
+
+            batch.keys[key] = None
+            if len(batch.keys) >= self.max_batch:
+                self._batch = None
+                await self._dispatch(batch)
+            elif is_leader:
+                await self._lead(batch)
+            else:
+                await batch.event.wait()
+
+            if not batch.cancelled:
+                break
+            # The task dispatching this batch was cancelled, queue the key again
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results.get(key)
+
+    async def _lead(self, batch: _Batch) -> None:
+        """
+        Waits for the batch window to close and dispatches the batch,
+        unless it has been filled up and dispatched in the meantime
+        """
+        try:
+            await anyio.sleep(self.window)
+        except BaseException:
+            # A full batch has been dispatched by another task, which sets the event
+            if not batch.dispatched:
+                if self._batch is batch:
+                    self._batch = None
+                batch.cancelled = True
+                batch.event.set()
+            raise
+
+        if batch.dispatched:
+            await batch.event.wait()
+            return
+
+        if self._batch is batch:
+            self._batch = None
+        await self._dispatch(batch)
+
+    async def _dispatch(self, batch: _Batch) -> None:
+        batch.dispatched = True
+        keys = list(batch.keys)
+        try:
+            if self._is_async:
+                values = await self._fn(keys)
+            else:
+                values = await anyio.to_thread.run_sync(
+                    self._fn, keys, limiter=self._limiter
+                )
+            batch.results = self._map_results(keys, values)
+        except Exception as e:
+            batch.error = e
+        except BaseException:
+            batch.cancelled = True
+            raise
+        finally:
+            batch.event.set()
+
+    @staticmethod
+    def _map_results(keys: List[Hashable], values: Any) -> Dict[Hashable, Any]:
+        if isinstance(values, Mapping):
+            return {key: values.get(key) for key in keys}
+
+        values = list(values)
+        if len(values) != len(keys):
+            raise ValueError(
+                f"The batch function returned {len(values)} values for {len(keys)} keys"
+            )
+        return dict(zip(keys, values))
@@ -11,7 +11,7 @@ from fastapi_login import LoginManager
 try:
     from cryptography.hazmat.backends import default_backend
     from cryptography.hazmat.primitives import serialization
-    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 
     _has_cryptography = True
 
@@ -30,12 +30,50 @@ try:
         )
         return private_key
 
+    def generate_rsa_key_object(key_size=2048):
+        return rsa.generate_private_key(
+            public_exponent=65537, key_size=key_size, backend=default_backend()
+        )
+
+    def generate_rsa_key_der(key_size=2048):
+        return generate_rsa_key_object(key_size).private_bytes(
+            serialization.Encoding.DER,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+
+    def _private_pem(key):
+        return key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+
+    def generate_ec_key(curve_name="secp256r1"):
+        curve = {"secp256r1": ec.SECP256R1, "secp384r1": ec.SECP384R1}[curve_name]
+        return _private_pem(ec.generate_private_key(curve(), default_backend()))
+
+    def generate_ed25519_key():
+        return _private_pem(ed25519.Ed25519PrivateKey.generate())
+
 except ImportError:
     _has_cryptography = False
 
+    def generate_ec_key(curve_name="secp256r1"):
+        return b""
+
+    def generate_ed25519_key():
+        return b""
+
     def generate_rsa_key(key_size=2048, password=None):
         return b""
 
+    def generate_rsa_key_object(key_size=2048):
+        return None
+
+    def generate_rsa_key_der(key_size=2048):
+        return b""
+
 
 require_cryptography = pytest.mark.skipif(
     not _has_cryptography, reason="Cryptography Not Installed."
@@ -96,6 +134,8 @@ def secret():
     params=[
         pytest.param((secrets.token_hex(16), "HS256")),
         pytest.param((generate_rsa_key(1024), "RS256"), marks=require_cryptography),
+        pytest.param((generate_ec_key(), "ES256"), marks=require_cryptography),
+        pytest.param((generate_ed25519_key(), "EdDSA"), marks=require_cryptography),
     ],
 )
 def secret_and_algorithm(request) -> str:
@@ -0,0 +1,109 @@
+import asyncio
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from fastapi_login import KeyRing, LoginManager, minting
+from fastapi_login.codec import TokenEncoder
+
+
+@pytest.mark.asyncio
+async def test_acreate_access_token(clean_manager, default_data):
+    token = await clean_manager.acreate_access_token(data=default_data, scopes=["read"])
+    payload = clean_manager._get_payload(token)
+
+    assert payload["sub"] == default_data["sub"]
+    assert payload["scopes"] == ["read"]
+
+
+@pytest.mark.asyncio
+async def test_acreate_access_token_signs_off_the_event_loop(token_url, default_data):
+    manager = LoginManager(secrets.token_hex(16), token_url)
+    loop_thread = threading.get_ident()
+    threads = []
+    encode = TokenEncoder.encode
+
+    def record_thread(self, payload):
+        threads.append(threading.get_ident())
+        return encode(self, payload)
+
+    with patch.object(TokenEncoder, "encode", record_thread):
+        await manager.acreate_access_token(data=default_data)
+
+    assert threads and loop_thread not in threads
+
+
+@pytest.mark.asyncio
+async def test_acreate_access_token_limits_concurrency(token_url, default_data):
+    manager = LoginManager(secrets.token_hex(16), token_url, signing_concurrency=2)
+    active = max_active = 0
+    lock = threading.Lock()
+    encode = TokenEncoder.encode
+
+    def slow_encode(self, payload):
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return encode(self, payload)
+
+    with patch.object(TokenEncoder, "encode", slow_encode):
+        await asyncio.gather(
+            *(manager.acreate_access_token(data=default_data) for _ in range(8))
+        )
+
+    assert max_active == 2
+
+
+@pytest.mark.parametrize("executor_cls", [ThreadPoolExecutor, ProcessPoolExecutor])
+@pytest.mark.asyncio
+async def test_acreate_access_token_custom_executor(
+    executor_cls, token_url, default_data
+):
+    keyring = KeyRing()
+    keyring.add("current", secrets.token_hex(16))
+    with executor_cls(max_workers=2) as pool:
+        manager = LoginManager(keyring, token_url, signing_executor=pool)
+        token = await manager.acreate_access_token(data=default_data)
+
+    assert jwt.get_unverified_header(token)["kid"] == "current"
+    assert manager._get_payload(token)["sub"] == default_data["sub"]
+
+
+@pytest.mark.asyncio
+async def test_process_pool_serializes_key_once(token_url, default_data):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        manager = LoginManager(secrets.token_hex(16), token_url, signing_executor=pool)
+        with patch(
+            "fastapi_login.minting._serialize_key", wraps=minting._serialize_key
+        ) as serialize:
+            for _ in range(3):
+                await manager.acreate_access_token(data=default_data)
+
+    serialize.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_custom_executor_does_not_block_a_worker_thread(token_url, default_data):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        manager = LoginManager(secrets.token_hex(16), token_url, signing_executor=pool)
+        with patch("fastapi_login.fastapi_login.run_sync") as run_sync:
+            tokens = await asyncio.gather(
+                *(manager.acreate_access_token(data=default_data) for _ in range(4))
+            )
+
+    run_sync.assert_not_called()
+    assert all(manager._get_payload(token) for token in tokens)
+
+
+def test_signing_concurrency_must_be_positive(token_url):
+    with pytest.raises(ValueError):
+        LoginManager(secrets.token_hex(16), token_url, signing_concurrency=0)
@@ -0,0 +1,128 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from fastapi_login.utils import BatchLoader
+
+
+@pytest.mark.asyncio
+async def test_batch_user_loader_combines_requests(clean_manager, db):
+    calls = Mock()
+
+    @clean_manager.batch_user_loader()
+    async def load_users(emails):
+        calls(emails)
+        return [db.get(email) for email in emails]
+
+    emails = list(db) + ["missing@e.mail"]
+    users = await asyncio.gather(*(clean_manager._load_user(e) for e in emails))
+
+    calls.assert_called_once_with(emails)
+    assert users == [db.get(email) for email in emails]
+
+
+@pytest.mark.asyncio
+async def test_batch_user_loader_sync_mapping(clean_manager, default_data, db):
+    calls = Mock()
+
+    @clean_manager.batch_user_loader(db)
+    def load_users(emails, users):
+        calls(emails)
+        return {email: users[email] for email in emails if email in users}
+
+    token = clean_manager.create_access_token(data=default_data)
+    user = await clean_manager.get_current_user(token)
+
+    assert user is db[default_data["sub"]]
+    calls.assert_called_once_with([default_data["sub"]])
+
+
+@pytest.mark.asyncio
+async def test_batch_user_loader_deduplicates(clean_manager, default_data, db):
+    calls = Mock()
+
+    @clean_manager.batch_user_loader()
+    async def load_users(emails):
+        calls(emails)
+        return [db.get(email) for email in emails]
+
+    await asyncio.gather(
+        *(clean_manager._load_user(default_data["sub"]) for _ in range(5))
+    )
+
+    calls.assert_called_once_with([default_data["sub"]])
+
+
+@pytest.mark.asyncio
+async def test_batch_user_loader_max_batch(clean_manager, db):
+    calls = Mock()
+
+    @clean_manager.batch_user_loader(max_batch=1, window_ms=50)
+    async def load_users(emails):
+        calls(emails)
+        return [db.get(email) for email in emails]
+
+    await asyncio.gather(*(clean_manager._load_user(email) for email in db))
+
+    assert calls.call_count == len(db)
+
+
+@pytest.mark.asyncio
+async def test_batch_user_loader_error_reaches_every_waiter(clean_manager, db):
+    @clean_manager.batch_user_loader()
+    async def load_users(emails):
+        raise RuntimeError("database unavailable")
+
+    results = await asyncio.gather(
+        *(clean_manager._load_user(email) for email in db), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_wrong_result_length():
+    loader = BatchLoader(lambda keys: [])
+
+    with pytest.raises(ValueError):
+        await loader.load("key")
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_requeues_after_leader_cancelled():
+    loader = BatchLoader(lambda keys: keys, window_ms=50)
+
+    leader = asyncio.ensure_future(loader.load("a"))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(loader.load("b"))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "b"
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_leader_cancelled_after_dispatch():
+    calls = []
+
+    async def load(keys):
+        calls.append(keys)
+        await asyncio.sleep(0.01)
+        return keys
+
+    loader = BatchLoader(load, max_batch=2, window_ms=50)
+
+    leader = asyncio.ensure_future(loader.load("a"))
+    await asyncio.sleep(0)
+    dispatcher = asyncio.ensure_future(loader.load("b"))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await dispatcher == "b"
+    assert calls == [["a", "b"]]
+
+
+def test_batch_loader_requires_positive_batch_size():
+    with pytest.raises(ValueError):
+        BatchLoader(lambda keys: keys, max_batch=0)
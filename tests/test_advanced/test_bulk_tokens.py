@@ -0,0 +1,75 @@
+import secrets
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import jwt
+import pytest
+
+from fastapi_login import KeyRing, LoginManager
+
+from ..conftest import generate_rsa_key, require_cryptography
+
+ITEMS = [{"sub": f"user-{i}"} for i in range(10)]
+
+
+def subjects(manager, tokens):
+    return [manager._get_payload(token)["sub"] for token in tokens]
+
+
+def test_create_access_tokens_sequential(clean_manager):
+    tokens = clean_manager.create_access_tokens(ITEMS, scopes=["read"])
+
+    assert subjects(clean_manager, tokens) == [item["sub"] for item in ITEMS]
+    assert clean_manager._get_payload(tokens[0])["scopes"] == ["read"]
+
+
+def test_create_access_tokens_thread_pool_keeps_order(clean_manager):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        tokens = clean_manager.create_access_tokens(ITEMS, executor=pool, chunk_size=3)
+
+    assert subjects(clean_manager, tokens) == [item["sub"] for item in ITEMS]
+
+
+@pytest.mark.parametrize(
+    ("secret", "algorithm"),
+    [
+        pytest.param(secrets.token_hex(16), "HS256"),
+        pytest.param(generate_rsa_key(2048), "RS256", marks=require_cryptography),
+    ],
+)
+def test_create_access_tokens_process_pool(secret, algorithm, token_url):
+    manager = LoginManager(secret, token_url, algorithm=algorithm)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        tokens = manager.create_access_tokens(ITEMS, executor=pool, chunk_size=4)
+
+    assert subjects(manager, tokens) == [item["sub"] for item in ITEMS]
+
+
+def test_create_access_tokens_keyring(token_url):
+    keyring = KeyRing()
+    keyring.add("current", secrets.token_hex(16))
+    manager = LoginManager(keyring, token_url)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        tokens = manager.create_access_tokens(ITEMS, executor=pool, chunk_size=4)
+
+    assert all(jwt.get_unverified_header(token)["kid"] == "current" for token in tokens)
+    assert subjects(manager, tokens) == [item["sub"] for item in ITEMS]
+
+
+@pytest.mark.parametrize("use_pool", [False, True])
+def test_iter_access_tokens(clean_manager, use_pool):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            clean_manager.iter_access_tokens(
+                ITEMS, executor=pool if use_pool else None, chunk_size=3
+            )
+        )
+
+    assert sorted(index for index, _ in results) == list(range(len(ITEMS)))
+    for index, token in results:
+        assert clean_manager._get_payload(token)["sub"] == ITEMS[index]["sub"]
+
+
+def test_create_access_tokens_empty(clean_manager):
+    with ThreadPoolExecutor() as pool:
+        assert clean_manager.create_access_tokens([], executor=pool) == []
@@ -0,0 +1,120 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from fastapi_login import KeyRing, LoginManager
+
+from ..conftest import generate_ed25519_key, require_cryptography
+
+
+@pytest.fixture
+def keyring() -> KeyRing:
+    ring = KeyRing()
+    ring.add("old", secrets.token_hex(16))
+    return ring
+
+
+@pytest.fixture
+def keyring_manager(keyring, token_url) -> LoginManager:
+    return LoginManager(keyring, token_url)
+
+
+def test_keyring_token_carries_kid(keyring_manager, default_data):
+    token = keyring_manager.create_access_token(data=default_data)
+    assert jwt.get_unverified_header(token)["kid"] == "old"
+    assert keyring_manager._get_payload(token)["sub"] == default_data["sub"]
+
+
+def test_keyring_rotation_keeps_old_tokens_valid(
+    keyring, keyring_manager, default_data
+):
+    old_token = keyring_manager.create_access_token(data=default_data)
+    keyring.add("new", secrets.token_hex(16))
+    new_token = keyring_manager.create_access_token(data=default_data)
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert keyring_manager._get_payload(old_token)["sub"] == default_data["sub"]
+    assert keyring_manager._get_payload(new_token)["sub"] == default_data["sub"]
+
+
+def test_keyring_add_without_making_current(keyring, keyring_manager, default_data):
+    keyring.add("next", secrets.token_hex(16), current=False)
+    token = keyring_manager.create_access_token(data=default_data)
+    assert jwt.get_unverified_header(token)["kid"] == "old"
+
+
+def test_keyring_retired_key_verifies_until_cutoff(
+    keyring, keyring_manager, default_data
+):
+    old_token = keyring_manager.create_access_token(data=default_data)
+    keyring.add("new", secrets.token_hex(16))
+    keyring.retire("old", verify_until=timedelta(minutes=5))
+
+    assert keyring_manager._get_payload(old_token)["sub"] == default_data["sub"]
+
+    keyring.retire("old", verify_until=datetime.now(timezone.utc))
+    with pytest.raises(HTTPException):
+        keyring_manager._get_payload(old_token)
+
+
+def test_keyring_retire_evicts_cached_payload(keyring, token_url, default_data):
+    manager = LoginManager(keyring, token_url, payload_cache_size=10)
+    old_token = manager.create_access_token(data=default_data)
+    manager._get_payload(old_token)
+
+    keyring.add("new", secrets.token_hex(16))
+    keyring.retire("old")
+
+    with pytest.raises(HTTPException):
+        manager._get_payload(old_token)
+
+
+def test_keyring_current_key_can_not_be_retired(keyring):
+    with pytest.raises(ValueError):
+        keyring.retire("old")
+    with pytest.raises(ValueError):
+        keyring.remove("old")
+
+
+@pytest.mark.parametrize("headers", [{}, {"kid": "unknown"}])
+def test_keyring_rejects_unknown_kid(keyring, keyring_manager, default_data, headers):
+    token = jwt.encode(
+        default_data,
+        keyring.current.secret.secret_for_encode,
+        "HS256",
+        headers=headers,
+    )
+    with pytest.raises(HTTPException):
+        keyring_manager._get_payload(token)
+
+
+def test_keyring_fallback_kid(token_url, default_data):
+    secret = secrets.token_hex(16)
+    legacy_manager = LoginManager(secret, token_url)
+    legacy_token = legacy_manager.create_access_token(data=default_data)
+
+    ring = KeyRing(fallback_kid="legacy")
+    ring.add("legacy", secret)
+    ring.add("new", secrets.token_hex(16))
+    manager = LoginManager(ring, token_url)
+
+    assert manager._get_payload(legacy_token)["sub"] == default_data["sub"]
+
+
+@require_cryptography
+def test_keyring_mixed_algorithms(keyring, keyring_manager, default_data):
+    old_token = keyring_manager.create_access_token(data=default_data)
+    keyring.add("ed", generate_ed25519_key(), algorithm="EdDSA")
+    new_token = keyring_manager.create_access_token(data=default_data)
+
+    assert jwt.get_unverified_header(new_token)["alg"] == "EdDSA"
+    assert keyring_manager._get_payload(old_token)["sub"] == default_data["sub"]
+    assert keyring_manager._get_payload(new_token)["sub"] == default_data["sub"]
+
+
+def test_empty_keyring_raises(token_url):
+    with pytest.raises(ValueError):
+        LoginManager(KeyRing(), token_url)
@@ -0,0 +1,91 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from starlette.requests import Request
+
+from fastapi_login import LoginManager
+from fastapi_login.middleware import LazyUser
+
+
+@pytest.fixture(scope="module")
+def lazy_loader(db):
+    return Mock(side_effect=db.get)
+
+
+@pytest.fixture(scope="module")
+def lazy_app(secret, token_url, lazy_loader):
+    app = FastAPI()
+    manager = LoginManager(secret, token_url)
+    manager.user_loader()(lazy_loader)
+    manager.attach_middleware(app, lazy=True)
+
+    @app.get("/health")
+    async def health():
+        return {"detail": "ok"}
+
+    @app.get("/private/lazy")
+    async def private_lazy(request: Request):
+        user = await request.state.user
+        again = await request.state.user
+        assert user is again
+        return {"user": None if user is None else user.email}
+
+    app.state.manager = manager
+    return app
+
+
+@pytest.fixture(scope="module")
+def lazy_client(lazy_app):
+    return AsyncClient(transport=ASGITransport(app=lazy_app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_lazy_user_not_loaded_when_unused(
+    lazy_app, lazy_client, lazy_loader, default_data
+):
+    lazy_loader.reset_mock()
+    token = lazy_app.state.manager.create_access_token(data=default_data)
+    resp = await lazy_client.get(
+        "/health", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert resp.status_code == 200
+    lazy_loader.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_lazy_user_loaded_once(lazy_app, lazy_client, lazy_loader, default_data):
+    lazy_loader.reset_mock()
+    token = lazy_app.state.manager.create_access_token(data=default_data)
+    resp = await lazy_client.get(
+        "/private/lazy", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert resp.json()["user"] == default_data["sub"]
+    lazy_loader.assert_called_once_with(default_data["sub"])
+
+
+@pytest.mark.asyncio
+async def test_lazy_user_anonymous(lazy_client):
+    resp = await lazy_client.get("/private/lazy")
+    assert resp.json()["user"] is None
+
+
+@pytest.mark.asyncio
+async def test_lazy_user_concurrent_awaits(secret, token_url, default_data, db):
+    manager = LoginManager(secret, token_url)
+    loader = Mock(side_effect=db.get)
+    manager.user_loader()(loader)
+    token = manager.create_access_token(data=default_data)
+    scope = {"headers": [(b"authorization", f"Bearer {token}".encode())]}
+
+    lazy_user = LazyUser(manager, scope)
+    assert not lazy_user.resolved
+    users = await asyncio.gather(lazy_user.get(), lazy_user.get())
+
+    assert lazy_user.resolved
+    assert users[0] is users[1] is db[default_data["sub"]]
+    loader.assert_called_once()
@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, Security
+from fastapi.testclient import TestClient
+
+from fastapi_login import LoginManager
+from fastapi_login.metrics import STAGES, AuthMetrics, Histogram
+
+
+@pytest.fixture
+def metrics() -> AuthMetrics:
+    return AuthMetrics()
+
+
+@pytest.fixture
+def metrics_client(metrics, secret, token_url, load_user_fn):
+    manager = LoginManager(secret, token_url, metrics=metrics)
+    manager.user_loader()(load_user_fn)
+    app = FastAPI()
+
+    @app.get("/private")
+    def private_route(_=Security(manager, scopes=["read"])):
+        return {"detail": "Success"}
+
+    return manager, TestClient(app)
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_metrics_record_all_stages(metrics, metrics_client, default_data):
+    manager, client = metrics_client
+    token = manager.create_access_token(data=default_data, scopes=["read"])
+
+    assert client.get("/private", headers=bearer(token)).status_code == 200
+
+    stages = metrics.snapshot()["stages"]
+    for stage in STAGES:
+        assert stages[stage]["count"] == 1
+        assert stages[stage]["buckets"]["+Inf"] == 1
+    assert not any(metrics.snapshot()["failures"].values())
+
+
+@pytest.mark.parametrize(
+    ("reason", "headers"),
+    [
+        ("missing_token", lambda manager, data: {}),
+        (
+            "expired",
+            lambda manager, data: bearer(
+                manager.create_access_token(
+                    data=data, scopes=["read"], expires=timedelta(seconds=-1)
+                )
+            ),
+        ),
+        (
+            "bad_signature",
+            lambda manager, data: bearer(
+                manager.create_access_token(data=data, scopes=["read"])[:-4] + "AAAA"
+            ),
+        ),
+        ("invalid_token", lambda manager, data: bearer("invalid-token")),
+        (
+            "scope",
+            lambda manager, data: bearer(manager.create_access_token(data=data)),
+        ),
+        (
+            "unknown_user",
+            lambda manager, data: bearer(
+                manager.create_access_token(
+                    data={"sub": "unknown@user.com"}, scopes=["read"]
+                )
+            ),
+        ),
+    ],
+)
+def test_metrics_count_failures(metrics, metrics_client, default_data, reason, headers):
+    manager, client = metrics_client
+    response = client.get("/private", headers=headers(manager, default_data))
+
+    assert response.status_code in (400, 401)
+    failures = metrics.snapshot()["failures"]
+    assert failures[reason] == 1
+    assert sum(failures.values()) == 1
+
+
+def test_metrics_count_revoked(metrics, secret, token_url, default_data):
+    manager = LoginManager(secret, token_url, metrics=metrics)
+    token = manager.create_access_token(data=default_data)
+    manager.revoke(token)
+
+    with pytest.raises(HTTPException):
+        manager._get_payload(token)
+    assert metrics.snapshot()["failures"]["revoked"] == 1
+
+
+def test_middleware_records_token_stage(metrics, secret, token_url, load_user_fn):
+    manager = LoginManager(secret, token_url, metrics=metrics)
+    manager.user_loader()(load_user_fn)
+    app = FastAPI()
+    manager.attach_middleware(app)
+
+    @app.get("/")
+    def index(request: Request):
+        return {"user": request.state.user is not None}
+
+    TestClient(app).get("/")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["token"]["count"] == 1
+    assert snapshot["failures"]["missing_token"] == 0
+
+
+def test_histogram_buckets():
+    histogram = Histogram(buckets=(0.001, 0.01))
+    for value in (0.0005, 0.001, 0.005, 1.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == {"0.001": 2, "0.01": 3, "+Inf": 4}
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(1.0065)
+
+
+def test_render_prometheus(metrics):
+    metrics.observe("payload", 0.00002)
+    metrics.failure("expired")
+    text = metrics.render_prometheus()
+
+    assert "# TYPE fastapi_login_stage_duration_seconds histogram" in text
+    assert (
+        'fastapi_login_stage_duration_seconds_bucket{stage="payload",le="2.5e-05"} 1'
+        in text
+    )
+    assert 'fastapi_login_stage_duration_seconds_count{stage="payload"} 1' in text
+    assert 'fastapi_login_failures_total{reason="expired"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_metrics_reset(metrics):
+    metrics.observe("user", 0.1)
+    metrics.failure("scope")
+    metrics.reset()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["user"]["count"] == 0
+    assert snapshot["failures"]["scope"] == 0
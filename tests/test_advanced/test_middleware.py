@@ -1,8 +1,10 @@
 import pytest
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
 from fastapi_login import LoginManager
 from fastapi_login.exceptions import InvalidCredentialsException
+from fastapi_login.middleware import token_from_scope
 
 
 @pytest.fixture(scope="module")
@@ -39,3 +41,59 @@ async def test_middleware_authorized(middleware_manager, client, default_data):
 
     assert resp.status_code == 200
     assert resp.json()["detail"] == "Success"
+
+
+@pytest.mark.asyncio
+async def test_middleware_streaming_response(app, middleware_manager, client):
+    @app.get("/private/stream")
+    def stream_route(request: Request):
+        def body():
+            yield b"user="
+            yield str(request.state.user is not None).encode()
+
+        return StreamingResponse(body())
+
+    resp = await client.get("/private/stream")
+
+    assert resp.status_code == 200
+    assert resp.text == "user=False"
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ([], None),
+        ([(b"authorization", b"Bearer abc")], "abc"),
+        ([(b"authorization", b"bearer  abc ")], "abc"),
+        ([(b"authorization", b"Basic abc")], None),
+        ([(b"authorization", b"Bearer")], None),
+        ([(b"authorization", b"Bearer a"), (b"authorization", b"Bearer b")], "a"),
+    ],
+)
+def test_token_from_scope_header(headers, expected):
+    manager = LoginManager("secret", "/auth/token")
+    assert token_from_scope(manager, {"headers": headers}) == expected
+
+
+def test_token_from_scope_cookie_before_header():
+    manager = LoginManager("secret", "/auth/token", use_cookie=True)
+    headers = [
+        (b"authorization", b"Bearer from-header"),
+        (b"cookie", b"other=1; access-token=from-cookie"),
+    ]
+    assert token_from_scope(manager, {"headers": headers}) == "from-cookie"
+
+
+def test_token_from_scope_empty_cookie_falls_back_to_header():
+    manager = LoginManager("secret", "/auth/token", use_cookie=True)
+    headers = [
+        (b"cookie", b"access-token="),
+        (b"authorization", b"Bearer from-header"),
+    ]
+    assert token_from_scope(manager, {"headers": headers}) == "from-header"
+
+
+def test_token_from_scope_cookie_only():
+    manager = LoginManager("secret", "/auth/token", use_cookie=True, use_header=False)
+    headers = [(b"authorization", b"Bearer from-header")]
+    assert token_from_scope(manager, {"headers": headers}) is None
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from fastapi_login import LoginManager
+from fastapi_login.metrics import AuthMetrics
+
+
+@pytest.fixture
+def negative_manager(secret_and_algorithm, token_url) -> LoginManager:
+    secret, algorithm = secret_and_algorithm
+    return LoginManager(secret, token_url, algorithm, negative_cache_size=2)
+
+
+def reject(manager, token):
+    with pytest.raises(HTTPException):
+        manager._get_payload(token)
+
+
+def test_negative_cache_disabled_by_default(clean_manager):
+    assert clean_manager.negative_cache is None
+
+
+def test_repeated_invalid_token_skips_decode(negative_manager, default_data):
+    token = negative_manager.create_access_token(
+        data=default_data, expires=timedelta(seconds=-1)
+    )
+    reject(negative_manager, token)
+
+    with patch.object(negative_manager, "_decode_token") as decode:
+        reject(negative_manager, token)
+
+    decode.assert_not_called()
+    stats = negative_manager.negative_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_valid_tokens_not_cached(negative_manager, default_data):
+    token = negative_manager.create_access_token(data=default_data)
+    negative_manager._get_payload(token)
+    assert len(negative_manager.negative_cache) == 0
+
+
+def test_negative_cache_is_bounded(negative_manager):
+    for i in range(5):
+        reject(negative_manager, f"invalid-token-{i}")
+
+    assert len(negative_manager.negative_cache) == 2
+    assert negative_manager.negative_cache.stats()["evictions"] == 3
+
+
+def test_negative_cache_entries_expire(secret, token_url):
+    manager = LoginManager(
+        secret, token_url, negative_cache_size=8, negative_cache_ttl=60
+    )
+    now = [1000.0]
+    manager.negative_cache.timer = lambda: now[0]
+    reject(manager, "invalid-token")
+
+    now[0] += 61
+    with patch.object(manager, "_decode_token", side_effect=jwt.DecodeError) as decode:
+        reject(manager, "invalid-token")
+
+    decode.assert_called_once()
+    assert manager.negative_cache.stats()["expirations"] == 1
+
+
+def test_immature_tokens_not_cached(secret, token_url, default_data):
+    manager = LoginManager(secret, token_url, negative_cache_size=8)
+    token = jwt.encode(
+        {"sub": "a", "exp": int(time.time()) + 120, "nbf": int(time.time()) + 60},
+        manager.secret.secret_for_encode,
+        "HS256",
+    )
+    reject(manager, token)
+    assert len(manager.negative_cache) == 0
+
+
+def test_negative_cache_reports_original_reason(secret, token_url, default_data):
+    metrics = AuthMetrics()
+    manager = LoginManager(secret, token_url, negative_cache_size=8, metrics=metrics)
+    token = manager.create_access_token(
+        data=default_data, expires=timedelta(seconds=-1)
+    )
+    reject(manager, token)
+    reject(manager, token)
+
+    assert metrics.snapshot()["failures"]["expired"] == 2
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from fastapi_login import LoginManager
+from fastapi_login.cache import ExpiringLRUCache
+
+
+@pytest.fixture
+def cached_manager(secret_and_algorithm, token_url) -> LoginManager:
+    secret, algorithm = secret_and_algorithm
+    return LoginManager(secret, token_url, algorithm, payload_cache_size=2)
+
+
+def test_payload_cache_disabled_by_default(clean_manager):
+    assert clean_manager.payload_cache is None
+
+
+def test_payload_cache_hit_skips_decode(cached_manager, default_data):
+    token = cached_manager.create_access_token(data=default_data)
+    first = cached_manager._get_payload(token)
+
+    with patch("fastapi_login.fastapi_login.jwt.decode") as decode:
+        second = cached_manager._get_payload(token)
+
+    decode.assert_not_called()
+    assert first == second
+    stats = cached_manager.payload_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_payload_cache_evicts_least_recently_used(cached_manager):
+    tokens = [
+        cached_manager.create_access_token(data={"sub": str(i)}) for i in range(3)
+    ]
+    for token in tokens:
+        cached_manager._get_payload(token)
+
+    assert len(cached_manager.payload_cache) == 2
+    assert cached_manager.payload_cache.evictions == 1
+
+
+def test_payload_cache_does_not_store_raw_token(cached_manager, default_data):
+    token = cached_manager.create_access_token(data=default_data)
+    cached_manager._get_payload(token)
+    assert token not in cached_manager.payload_cache._data
+
+
+def test_payload_cache_entry_expires_with_token(cached_manager, default_data):
+    token = cached_manager.create_access_token(
+        data=default_data, expires=timedelta(seconds=30)
+    )
+    payload = cached_manager._get_payload(token)
+
+    with patch.object(
+        cached_manager.payload_cache, "timer", return_value=payload["exp"] + 1
+    ):
+        with patch(
+            "fastapi_login.fastapi_login.jwt.decode", return_value=payload
+        ) as decode:
+            cached_manager._get_payload(token)
+
+    decode.assert_called_once()
+
+    assert cached_manager.payload_cache.expirations == 1
+
+
+def test_payload_cache_skips_tokens_without_expiry(cached_manager, default_data):
+    token = jwt.encode(
+        default_data,
+        cached_manager.secret.secret_for_encode,
+        cached_manager.algorithm,
+    )
+    cached_manager._get_payload(token)
+    assert len(cached_manager.payload_cache) == 0
+
+
+def test_payload_cache_invalid_token_not_cached(cached_manager):
+    with pytest.raises(HTTPException):
+        cached_manager._get_payload("invalid-token")
+    assert len(cached_manager.payload_cache) == 0
+
+
+def test_expiring_lru_cache_requires_positive_size():
+    with pytest.raises(ValueError):
+        ExpiringLRUCache(0)
+
+
+def test_lookup_without_caches(clean_manager, default_data):
+    token = clean_manager.create_access_token(data=default_data)
+    assert clean_manager._lookup_caches(token) == (None, None)
+
+
+def test_lookup_returns_cached_payload(cached_manager, default_data):
+    token = cached_manager.create_access_token(data=default_data)
+    cache_key, payload = cached_manager._lookup_caches(token)
+    assert cache_key is not None and payload is None
+
+    cached_manager._verify_and_cache(token, cache_key)
+    assert cached_manager._lookup_caches(token) == (
+        cache_key,
+        cached_manager._get_payload(token),
+    )
+
+
+def test_cached_payload_is_not_shared(cached_manager, default_data):
+    token = cached_manager.create_access_token(data=default_data)
+    cached_manager._get_payload(token)["sub"] = "evil"
+    cached_manager._get_payload(token)["sub"] = "evil"
+
+    assert cached_manager._get_payload(token)["sub"] == default_data["sub"]
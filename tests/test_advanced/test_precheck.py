@@ -0,0 +1,190 @@
+import base64
+import json
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from fastapi_login import KeyRing, LoginManager
+from fastapi_login.metrics import AuthMetrics
+from fastapi_login.precheck import TokenPrecheck
+
+from ..conftest import generate_ed25519_key, require_cryptography
+
+
+@pytest.fixture
+def precheck_manager(secret_and_algorithm, token_url) -> LoginManager:
+    secret, algorithm = secret_and_algorithm
+    return LoginManager(secret, token_url, algorithm, precheck=TokenPrecheck())
+
+
+def reject_early(manager, token):
+    with patch.object(manager, "_decode_token") as decode:
+        with pytest.raises(HTTPException):
+            manager._get_payload(token)
+    decode.assert_not_called()
+
+
+def test_precheck_disabled_by_default(clean_manager):
+    assert clean_manager.precheck is None
+
+
+def test_valid_token_passes(precheck_manager, default_data):
+    token = precheck_manager.create_access_token(data=default_data)
+    assert precheck_manager._get_payload(token)["sub"] == default_data["sub"]
+
+
+def test_max_length_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenPrecheck(max_length=0)
+
+
+def test_long_token_rejected(secret, token_url, default_data):
+    manager = LoginManager(secret, token_url, precheck=TokenPrecheck(max_length=64))
+    reject_early(manager, manager.create_access_token(data=default_data))
+
+
+@pytest.mark.parametrize("token", ["", "a.b", "a.b.c.d", "a.b.c.d.e"])
+def test_wrong_segment_count_rejected(precheck_manager, token):
+    reject_early(precheck_manager, token)
+
+
+def test_other_algorithm_rejected(secret, token_url, default_data):
+    manager = LoginManager(secret, token_url, precheck=TokenPrecheck())
+    token = jwt.encode(default_data, manager.secret.secret_for_encode, "HS512")
+    reject_early(manager, token)
+
+
+def test_none_algorithm_rejected(precheck_manager, default_data):
+    token = jwt.encode(default_data, None, "none")
+    reject_early(precheck_manager, token)
+
+
+def test_undecodable_header_rejected(precheck_manager, default_data):
+    token = precheck_manager.create_access_token(data=default_data)
+    reject_early(precheck_manager, "!!!!" + token[token.index(".") :])
+
+
+def test_unexpected_type_rejected(secret, token_url, default_data):
+    manager = LoginManager(secret, token_url, precheck=TokenPrecheck())
+    token = jwt.encode(
+        default_data, manager.secret.secret_for_encode, headers={"typ": "at+jwt"}
+    )
+    reject_early(manager, token)
+
+    manager.precheck = TokenPrecheck(allowed_types=("JWT", "at+jwt"))
+    assert manager._get_payload(token) == default_data
+
+
+def test_expired_token_rejected(precheck_manager, default_data):
+    token = precheck_manager.create_access_token(
+        data=default_data, expires=timedelta(seconds=-1)
+    )
+    reject_early(precheck_manager, token)
+
+
+def test_checks_can_be_disabled(secret, token_url, default_data):
+    precheck = TokenPrecheck(check_header=False, check_expiry=False)
+    manager = LoginManager(secret, token_url, precheck=precheck)
+    token = jwt.encode(
+        {**default_data, "exp": int(time.time()) - 10},
+        manager.secret.secret_for_encode,
+        "HS512",
+    )
+    with patch.object(manager, "_decode_token", side_effect=jwt.DecodeError) as decode:
+        with pytest.raises(HTTPException):
+            manager._get_payload(token)
+    decode.assert_called_once()
+
+
+@require_cryptography
+def test_keyring_algorithms(token_url, default_data):
+    keyring = KeyRing()
+    keyring.add("old", "old-secret-" * 3)
+    manager = LoginManager(keyring, token_url, precheck=TokenPrecheck())
+    old_token = manager.create_access_token(data=default_data)
+    keyring.add("ed", generate_ed25519_key(), algorithm="EdDSA")
+    new_token = manager.create_access_token(data=default_data)
+
+    assert manager._get_payload(old_token)["sub"] == default_data["sub"]
+    assert manager._get_payload(new_token)["sub"] == default_data["sub"]
+    reject_early(
+        manager,
+        jwt.encode(
+            default_data,
+            keyring.get("old").secret.secret_for_encode,
+            "HS512",
+            headers={"kid": "old"},
+        ),
+    )
+
+
+def test_precheck_failures_are_counted(secret, token_url, default_data):
+    metrics = AuthMetrics()
+    manager = LoginManager(secret, token_url, precheck=TokenPrecheck(), metrics=metrics)
+    reject_early(manager, "not-a-token")
+    reject_early(
+        manager,
+        manager.create_access_token(data=default_data, expires=timedelta(seconds=-1)),
+    )
+
+    failures = metrics.snapshot()["failures"]
+    assert failures["invalid_token"] == 1
+    assert failures["expired"] == 1
+
+
+def test_cached_payloads_skip_precheck(secret, token_url, default_data):
+    manager = LoginManager(
+        secret, token_url, precheck=TokenPrecheck(), payload_cache_size=8
+    )
+    token = manager.create_access_token(data=default_data)
+    manager._get_payload(token)
+
+    with patch.object(manager.precheck, "check") as check:
+        assert manager._get_payload(token)["sub"] == default_data["sub"]
+    check.assert_not_called()
+
+
+@require_cryptography
+def test_keyring_algorithms_follow_keys():
+    keyring = KeyRing()
+    keyring.add("hs", "hs-secret-" * 4)
+    keyring.add("ed", generate_ed25519_key(), algorithm="EdDSA", current=False)
+    assert keyring.algorithms == {"HS256", "EdDSA"}
+    assert keyring.algorithms is keyring.algorithms
+
+    keyring.remove("ed")
+    assert keyring.algorithms == {"HS256"}
+
+
+def crafted_token(header):
+    segments = [json.dumps(header).encode(), json.dumps({"sub": "a"}).encode()]
+    return (
+        ".".join(
+            base64.urlsafe_b64encode(segment).rstrip(b"=").decode()
+            for segment in segments
+        )
+        + ".c2ln"
+    )
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        {"alg": "HS256", "typ": ["JWT"]},
+        {"alg": "HS256", "typ": {"JWT": 1}},
+        {"alg": ["HS256"], "typ": "JWT"},
+        {"alg": {"HS256": 1}},
+    ],
+)
+@pytest.mark.parametrize("use_keyring", [False, True])
+def test_unhashable_headers_rejected(token_url, header, use_keyring):
+    secret = "precheck-secret-" * 2
+    if use_keyring:
+        secret = KeyRing()
+        secret.add("key", "precheck-secret-" * 2)
+    manager = LoginManager(secret, token_url, precheck=TokenPrecheck())
+    reject_early(manager, crafted_token(header))
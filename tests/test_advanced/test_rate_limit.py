@@ -0,0 +1,248 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+from fastapi_login import LoginManager
+from fastapi_login.metrics import AuthMetrics
+from fastapi_login.ratelimit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock) -> RateLimiter:
+    return RateLimiter(rate=1.0, burst=3, timer=clock)
+
+
+@pytest.fixture
+def limited_client(limiter, secret, token_url, load_user_fn, db):
+    metrics = AuthMetrics()
+    manager = LoginManager(secret, token_url, rate_limiter=limiter, metrics=metrics)
+    manager.user_loader()(load_user_fn)
+    app = FastAPI()
+
+    @app.get("/private")
+    def private_route(_=Depends(manager)):
+        return {"detail": "Success"}
+
+    @app.post(token_url)
+    def login(request: Request, username: str, password: str):
+        manager.check_rate_limit(request, username)
+        user = db.get(username)
+        if user is None or user.password != password:
+            manager.count_failed_attempt(request, username)
+            raise manager.not_authenticated_exception
+        return {"access_token": manager.create_access_token(data={"sub": username})}
+
+    return manager, TestClient(app)
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"rate": 0}, {"burst": 0}, {"shards": 0}, {"max_keys": 4, "shards": 8}],
+)
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        RateLimiter(**kwargs)
+
+
+def test_bucket_empties_and_refills(limiter, clock):
+    for _ in range(3):
+        assert limiter.allowed("key")
+        limiter.hit("key")
+    assert not limiter.allowed("key")
+    assert limiter.retry_after("key") == pytest.approx(1.0)
+    assert limiter.allowed("other")
+
+    clock.now += 1
+    assert limiter.allowed("key")
+    assert limiter.retry_after("key") == 0.0
+
+
+def test_bucket_refills_up_to_burst(limiter, clock):
+    limiter.hit("key")
+    clock.now += 3600
+    for _ in range(3):
+        limiter.hit("key")
+    assert not limiter.allowed("key")
+
+
+def test_reset(limiter):
+    for _ in range(3):
+        limiter.hit("key")
+    limiter.reset("key")
+    assert limiter.allowed("key")
+    assert len(limiter) == 0
+
+
+def test_memory_is_bounded(clock):
+    limiter = RateLimiter(max_keys=8, shards=2, timer=clock)
+    for i in range(100):
+        limiter.hit(f"key-{i}")
+    assert len(limiter) <= 8
+
+    limiter.clear()
+    assert len(limiter) == 0
+
+
+def test_disabled_by_default(clean_manager):
+    assert clean_manager.rate_limiter is None
+    request = Request({"type": "http", "headers": [], "client": ("1.2.3.4", 1)})
+    clean_manager.check_rate_limit(request, "john@doe.com")
+    clean_manager.count_failed_attempt(request, "john@doe.com")
+
+
+def test_invalid_tokens_are_limited(limited_client):
+    manager, client = limited_client
+    for _ in range(3):
+        assert client.get("/private", headers=bearer("invalid")).status_code == 401
+
+    with patch.object(manager, "_get_payload") as get_payload:
+        response = client.get("/private", headers=bearer("invalid"))
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    get_payload.assert_not_called()
+    assert manager.metrics.snapshot()["failures"]["rate_limited"] == 1
+
+    # the limit applies to the client, even with a valid token
+    token = manager.create_access_token(data={"sub": "john@doe.com"})
+    assert client.get("/private", headers=bearer(token)).status_code == 429
+
+
+def test_valid_tokens_are_not_counted(limited_client, limiter):
+    manager, client = limited_client
+    token = manager.create_access_token(data={"sub": "john@doe.com"})
+    for _ in range(5):
+        assert client.get("/private", headers=bearer(token)).status_code == 200
+    assert len(limiter) == 0
+
+
+def test_missing_tokens_are_not_counted(limited_client, limiter):
+    _, client = limited_client
+    for _ in range(5):
+        assert client.get("/private").status_code == 401
+    assert len(limiter) == 0
+
+
+def test_unknown_user_is_limited(limited_client, limiter):
+    manager, client = limited_client
+    token = manager.create_access_token(data={"sub": "unknown@user.com"})
+    for _ in range(3):
+        assert client.get("/private", headers=bearer(token)).status_code == 401
+
+    assert not limiter.allowed(("ip", "testclient"))
+    with patch.object(manager, "_load_user") as load_user:
+        assert client.get("/private", headers=bearer(token)).status_code == 429
+    load_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_user_loader_errors_are_not_counted(secret, token_url, limiter):
+    manager = LoginManager(secret, token_url, rate_limiter=limiter)
+
+    @manager.user_loader()
+    def load_user(email):
+        raise RuntimeError("database unavailable")
+
+    token = manager.create_access_token(data={"sub": "john@doe.com"})
+    request = Request(
+        {
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+            "client": ("1.2.3.4", 1),
+        }
+    )
+    with pytest.raises(RuntimeError):
+        await manager(request)
+    assert len(limiter) == 0
+
+
+def test_login_route_is_limited(limited_client, clock):
+    _, client = limited_client
+    params = {"username": "john@doe.com", "password": "wrong"}
+    for _ in range(3):
+        assert client.post("/auth/token", params=params).status_code == 401
+
+    params["password"] = "hunter2"
+    assert client.post("/auth/token", params=params).status_code == 429
+
+    clock.now += 1
+    assert client.post("/auth/token", params=params).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_failed_logins_do_not_block_tokens(limited_client, limiter):
+    manager, client = limited_client
+    attacker = AsyncClient(
+        transport=ASGITransport(app=client.app, client=("6.6.6.6", 1)),
+        base_url="http://test",
+    )
+    params = {"username": "john@doe.com", "password": "wrong"}
+    for _ in range(4):
+        await attacker.post("/auth/token", params=params)
+    response = await attacker.post("/auth/token", params=params)
+    assert response.status_code == 429
+    assert not limiter.allowed(("login", "john@doe.com"))
+
+    token = manager.create_access_token(data={"sub": "john@doe.com"})
+    assert client.get("/private", headers=bearer(token)).status_code == 200
+
+
+def test_middleware_respects_limit(limiter, secret, token_url, load_user_fn):
+    manager = LoginManager(secret, token_url, rate_limiter=limiter)
+    manager.user_loader()(load_user_fn)
+    app = FastAPI()
+    manager.attach_middleware(app)
+
+    @app.get("/private")
+    def private_route(_=Depends(manager)):
+        return {"detail": "Success"}
+
+    client = TestClient(app)
+    with patch.object(
+        manager, "_get_payload", wraps=manager._get_payload
+    ) as get_payload:
+        statuses = [
+            client.get("/private", headers=bearer("invalid")).status_code
+            for _ in range(5)
+        ]
+
+    assert statuses == [401, 401, 401, 429, 429]
+    # decoded once per request, only until the client is over the limit
+    assert get_payload.call_count == 3
+    assert limiter.retry_after(("ip", "testclient")) == pytest.approx(1.0)
+
+
+def test_custom_rate_limit_exception(secret, token_url, limiter):
+    exception = HTTPException(status_code=403, detail="Blocked")
+    manager = LoginManager(
+        secret, token_url, rate_limiter=limiter, rate_limit_exception=exception
+    )
+    assert manager.rate_limit_exception is exception
+
+    request = Request({"type": "http", "headers": [], "client": ("1.2.3.4", 1)})
+    for _ in range(3):
+        manager.count_failed_attempt(request)
+    with pytest.raises(HTTPException) as exc_info:
+        manager.check_rate_limit(request)
+    assert exc_info.value.status_code == 403
+    assert exc_info.value.headers == {"Retry-After": "1"}
+    assert exception.headers is None
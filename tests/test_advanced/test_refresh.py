@@ -0,0 +1,178 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from fastapi_login.refresh import (
+    InMemoryRefreshStore,
+    RefreshRecord,
+    RefreshTokenStore,
+)
+
+
+def unverified(token):
+    return jwt.decode(token, options={"verify_signature": False})
+
+
+@pytest.mark.asyncio
+async def test_exchange_issues_new_tokens(clean_manager, default_data):
+    refresh_token = clean_manager.create_refresh_token(
+        data={**default_data, "role": "admin"}, scopes=["read"]
+    )
+    access_token, new_refresh_token = await clean_manager.exchange_refresh_token(
+        refresh_token
+    )
+
+    payload = clean_manager._get_payload(access_token)
+    assert payload["sub"] == default_data["sub"]
+    assert payload["role"] == "admin"
+    assert payload["scopes"] == ["read"]
+    assert "fam" not in payload and "token_type" not in payload
+
+    assert new_refresh_token != refresh_token
+    assert unverified(new_refresh_token)["fam"] == unverified(refresh_token)["fam"]
+
+
+@pytest.mark.asyncio
+async def test_exchange_does_not_load_user(clean_manager, default_data):
+    loader = Mock(return_value=None)
+    clean_manager.user_loader()(loader)
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+
+    await clean_manager.exchange_refresh_token(refresh_token)
+    loader.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_exchange_load_user(clean_manager, default_data, load_user_fn):
+    clean_manager.user_loader()(load_user_fn)
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+    await clean_manager.exchange_refresh_token(refresh_token, load_user=True)
+
+    unknown = clean_manager.create_refresh_token(data={"sub": "unknown@user.com"})
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(unknown, load_user=True)
+
+
+@pytest.mark.asyncio
+async def test_failed_exchange_can_be_retried(clean_manager, default_data, db):
+    loader = Mock(side_effect=[ConnectionError, db[default_data["sub"]]])
+    clean_manager.user_loader()(loader)
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+
+    with pytest.raises(ConnectionError):
+        await clean_manager.exchange_refresh_token(refresh_token, load_user=True)
+
+    await clean_manager.exchange_refresh_token(refresh_token, load_user=True)
+    assert len(clean_manager.refresh_store) == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_family(clean_manager, default_data):
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+    _, rotated = await clean_manager.exchange_refresh_token(refresh_token)
+
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(refresh_token)
+
+    # the token issued to the legitimate client is revoked as well
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(rotated)
+
+
+@pytest.mark.asyncio
+async def test_revoke_refresh_token(clean_manager, default_data):
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+    clean_manager.revoke_refresh_token(refresh_token)
+
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(refresh_token)
+
+
+@pytest.mark.asyncio
+async def test_revoked_refresh_token_can_not_be_exchanged(clean_manager, default_data):
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+    clean_manager.revoke(refresh_token)
+
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(refresh_token)
+    # nothing has been consumed
+    record = clean_manager.refresh_store.consume(unverified(refresh_token)["jti"])
+    assert record is not None and not record.used
+
+
+@pytest.mark.asyncio
+async def test_access_token_can_not_be_exchanged(clean_manager, default_data):
+    access_token = clean_manager.create_access_token(data=default_data)
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(access_token)
+    with pytest.raises(HTTPException):
+        clean_manager.revoke_refresh_token(access_token)
+
+
+def test_refresh_token_is_not_an_access_token(clean_manager, default_data):
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+    with pytest.raises(HTTPException):
+        clean_manager._get_payload(refresh_token)
+
+
+@pytest.mark.asyncio
+async def test_expired_refresh_token(clean_manager, default_data):
+    refresh_token = clean_manager.create_refresh_token(
+        data=default_data, expires=timedelta(seconds=-1)
+    )
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(refresh_token)
+
+
+@pytest.mark.asyncio
+async def test_unknown_refresh_token(clean_manager, default_data):
+    refresh_token = clean_manager.create_refresh_token(data=default_data)
+    # e.g. the process has been restarted
+    clean_manager.refresh_store = InMemoryRefreshStore()
+
+    with pytest.raises(HTTPException):
+        await clean_manager.exchange_refresh_token(refresh_token)
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_incomplete_store_can_not_be_created():
+    class Store(RefreshTokenStore):
+        def add(self, record):
+            pass
+
+    with pytest.raises(TypeError):
+        Store()
+
+
+def test_in_memory_store_consume():
+    store = InMemoryRefreshStore()
+    store.add(RefreshRecord("a", "family", store.timer() + 60))
+
+    assert store.consume("a").used is False
+    assert store.consume("a").used is True
+    assert store.consume("unknown") is None
+
+
+def test_in_memory_store_purges_expired_records():
+    timer = FakeTimer()
+    store = InMemoryRefreshStore(timer=timer)
+    store.add(RefreshRecord("a", "family", timer.now + 10))
+    store.add(RefreshRecord("b", "family", timer.now + 100))
+
+    timer.now += 50
+    assert store.consume("a") is None
+    store.add(RefreshRecord("c", "other", timer.now + 100))
+
+    assert len(store) == 2
+    store.revoke_family("family")
+    assert len(store) == 1
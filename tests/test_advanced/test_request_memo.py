@@ -0,0 +1,91 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import Depends, FastAPI, Request, Security
+from fastapi.testclient import TestClient
+
+from fastapi_login import LoginManager
+
+
+@pytest.fixture
+def memo_app(secret, token_url, db):
+    manager = LoginManager(secret, token_url, scopes={"read": "", "write": ""})
+    loader = Mock(side_effect=db.get)
+    manager.user_loader()(loader)
+    app = FastAPI()
+    manager.attach_middleware(app)
+
+    def reader(user=Security(manager, scopes=["read"])):
+        return user
+
+    def writer(user=Security(manager, scopes=["write"])):
+        return user
+
+    @app.get("/read")
+    def read_route(
+        request: Request,
+        user=Depends(manager),
+        read_user=Depends(reader),
+        optional_user=Depends(manager.optional),
+    ):
+        assert user is read_user is optional_user is request.state.user
+        return {"detail": "Success"}
+
+    @app.get("/write")
+    def write_route(_=Depends(reader), __=Depends(writer)):
+        return {"detail": "Success"}
+
+    return manager, loader, TestClient(app)
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_user_loaded_once_per_request(memo_app, default_data):
+    manager, loader, client = memo_app
+    token = manager.create_access_token(data=default_data, scopes=["read"])
+
+    with patch.object(manager, "_decode_token", wraps=manager._decode_token) as decode:
+        response = client.get("/read", headers=bearer(token))
+
+    assert response.status_code == 200
+    decode.assert_called_once()
+    loader.assert_called_once_with(default_data["sub"])
+
+
+def test_scopes_checked_for_every_use(memo_app, default_data):
+    manager, loader, client = memo_app
+    token = manager.create_access_token(data=default_data, scopes=["read"])
+
+    response = client.get("/write", headers=bearer(token))
+
+    assert response.status_code == 400
+    loader.assert_called_once_with(default_data["sub"])
+
+
+def test_results_not_shared_between_requests(memo_app, default_data):
+    manager, loader, client = memo_app
+    token = manager.create_access_token(data=default_data, scopes=["read"])
+
+    for _ in range(2):
+        assert client.get("/read", headers=bearer(token)).status_code == 200
+    assert loader.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_multiple_managers_memoized_separately(secret, token_url, db):
+    first = LoginManager(secret, token_url)
+    second = LoginManager("other-secret" * 3, token_url)
+    first.user_loader()(db.get)
+    second.user_loader()(db.get)
+    token = first.create_access_token(data={"sub": next(iter(db))})
+    request = Request(
+        {
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+    assert await first(request) is not None
+    assert await second.optional(request) is None
@@ -0,0 +1,163 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from fastapi_login import LoginManager
+from fastapi_login.revocation import BloomFilter, RevocationList
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_access_token_has_unique_jti(clean_manager, default_data):
+    first = clean_manager._get_payload(
+        clean_manager.create_access_token(data=default_data)
+    )
+    second = clean_manager._get_payload(
+        clean_manager.create_access_token(data=default_data)
+    )
+    assert first["jti"] != second["jti"]
+
+
+def test_explicit_jti_is_kept(clean_manager):
+    token = clean_manager.create_access_token(data={"sub": "a", "jti": "my-id"})
+    assert clean_manager._get_payload(token)["jti"] == "my-id"
+
+
+def test_revoked_token_is_rejected(clean_manager, default_data):
+    token = clean_manager.create_access_token(data=default_data)
+    other = clean_manager.create_access_token(data=default_data)
+    clean_manager.revoke(token)
+
+    with pytest.raises(HTTPException):
+        clean_manager._get_payload(token)
+    assert clean_manager._get_payload(other)["sub"] == default_data["sub"]
+    assert clean_manager.is_revoked(
+        jwt.decode(token, options={"verify_signature": False})["jti"]
+    )
+
+
+def test_revocation_applies_to_cached_payloads(token_url, default_data):
+    manager = LoginManager("secret" * 8, token_url, payload_cache_size=16)
+    token = manager.create_access_token(data=default_data)
+    manager._get_payload(token)
+    manager.revoke(token)
+
+    with pytest.raises(HTTPException):
+        manager._get_payload(token)
+
+
+def test_revoke_request(secret, token_url, default_data, load_user_fn):
+    manager = LoginManager(secret, token_url)
+    manager.user_loader()(load_user_fn)
+    app = FastAPI()
+
+    @app.post("/logout")
+    async def logout(request: Request, _=Depends(manager)):
+        await manager.revoke_request(request)
+
+    client = TestClient(app)
+    headers = {
+        "Authorization": f"Bearer {manager.create_access_token(data=default_data)}"
+    }
+    assert client.post("/logout", headers=headers).status_code == 200
+    assert client.post("/logout", headers=headers).status_code == 401
+
+
+def test_revoke_invalid_token(clean_manager):
+    with pytest.raises(HTTPException):
+        clean_manager.revoke("invalid-token")
+
+
+def test_revoke_expired_token_is_noop(clean_manager, default_data):
+    token = clean_manager.create_access_token(
+        data=default_data, expires=timedelta(seconds=-1)
+    )
+    clean_manager.revoke(token)
+    assert clean_manager.revocations is None
+
+
+def test_revoke_requires_jti(clean_manager):
+    token = jwt.encode(
+        {"sub": "a", "exp": int(time.time()) + 60},
+        clean_manager.secret.secret_for_encode,
+        clean_manager.algorithm,
+    )
+    with pytest.raises(ValueError):
+        clean_manager.revoke(token)
+
+
+def test_not_revoked_without_revocations(clean_manager):
+    assert clean_manager.is_revoked("unknown") is False
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(100, 0.01)
+    items = [f"item-{i}" for i in range(100)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(bloom.might_contain(item) for item in items)
+    false_positives = sum(bloom.might_contain(f"other-{i}") for i in range(10_000))
+    assert false_positives < 300
+
+
+@pytest.mark.parametrize(("capacity", "error_rate"), [(0, 0.01), (10, 0), (10, 1)])
+def test_bloom_filter_invalid_arguments(capacity, error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, error_rate)
+
+
+def test_revocation_list_expires_entries():
+    timer = FakeTimer()
+    revocations = RevocationList(timer=timer)
+    revocations.add("short", timer.now + 10)
+    revocations.add("long", timer.now + 100)
+    revocations.add("forever")
+
+    timer.now += 50
+    revocations.purge()
+
+    assert "short" not in revocations
+    assert "long" in revocations
+    assert "forever" in revocations
+    assert len(revocations) == 2
+
+
+def test_revocation_list_ignores_expired_tokens():
+    timer = FakeTimer()
+    revocations = RevocationList(timer=timer)
+    revocations.add("expired", timer.now - 1)
+    assert len(revocations) == 0
+
+
+def test_revocation_list_grows_beyond_capacity():
+    revocations = RevocationList(capacity=4)
+    for i in range(20):
+        revocations.add(f"jti-{i}")
+
+    assert all(f"jti-{i}" in revocations for i in range(20))
+    assert revocations._filter.capacity >= 20
+
+
+def test_revocation_list_rebuilds_filter_after_purge():
+    timer = FakeTimer()
+    revocations = RevocationList(capacity=64, timer=timer)
+    for i in range(30):
+        revocations.add(f"old-{i}", timer.now + 1)
+
+    timer.now += 2
+    revocations.add("new", timer.now + 10)
+
+    assert revocations._filter_items == 1
+    assert not any(revocations._filter.might_contain(f"old-{i}") for i in range(30))
+    assert "new" in revocations
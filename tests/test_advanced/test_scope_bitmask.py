@@ -0,0 +1,67 @@
+import pytest
+from fastapi.security import SecurityScopes
+
+from fastapi_login import LoginManager
+
+SCOPES = {f"scope-{i}": f"Scope {i}" for i in range(70)}
+
+
+@pytest.fixture
+def bitmask_manager(secret, token_url) -> LoginManager:
+    return LoginManager(secret, token_url, scopes=SCOPES, scope_bitmask=True)
+
+
+def test_scopes_stored_as_integer(bitmask_manager, default_data):
+    token = bitmask_manager.create_access_token(
+        data=default_data, scopes=["scope-0", "scope-2", "scope-69"]
+    )
+    payload = bitmask_manager._get_payload(token)
+
+    assert "scopes" not in payload
+    assert payload["scope_bits"] == 1 | 1 << 2 | 1 << 69
+    assert bitmask_manager.scopes_of(payload) == ["scope-0", "scope-2", "scope-69"]
+
+
+@pytest.mark.parametrize(
+    ("required", "expected"),
+    [
+        ([], True),
+        (["scope-0"], True),
+        (["scope-0", "scope-69"], True),
+        (["scope-1"], False),
+        (["scope-0", "scope-1"], False),
+        (["undeclared"], False),
+    ],
+)
+def test_bitmask_has_scopes(bitmask_manager, default_data, required, expected):
+    token = bitmask_manager.create_access_token(
+        data=default_data, scopes=["scope-0", "scope-69"]
+    )
+    assert (
+        bitmask_manager.has_scopes(token, SecurityScopes(scopes=required)) is expected
+    )
+
+
+def test_list_tokens_still_accepted(secret, token_url, default_data):
+    list_manager = LoginManager(secret, token_url, scopes=SCOPES)
+    token = list_manager.create_access_token(data=default_data, scopes=["scope-3"])
+
+    bitmask_manager = LoginManager(secret, token_url, scopes=SCOPES, scope_bitmask=True)
+    assert bitmask_manager.has_scopes(token, SecurityScopes(scopes=["scope-3"]))
+    assert not bitmask_manager.has_scopes(token, SecurityScopes(scopes=["scope-4"]))
+    assert bitmask_manager.scopes_of(bitmask_manager._get_payload(token)) == ["scope-3"]
+
+
+def test_token_without_scopes(bitmask_manager, default_data):
+    token = bitmask_manager.create_access_token(data=default_data)
+    assert not bitmask_manager.has_scopes(token, SecurityScopes(scopes=["scope-0"]))
+
+
+def test_unknown_scope_raises(bitmask_manager, default_data):
+    with pytest.raises(ValueError):
+        bitmask_manager.create_access_token(data=default_data, scopes=["undeclared"])
+
+
+def test_scope_bitmask_requires_declared_scopes(secret, token_url):
+    with pytest.raises(ValueError):
+        LoginManager(secret, token_url, scope_bitmask=True)
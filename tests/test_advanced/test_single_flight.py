@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from fastapi_login.utils import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_coalesced_async_loader_called_once(clean_manager, default_data, db):
+    calls = Mock()
+
+    @clean_manager.user_loader(coalesce=True)
+    async def load_user(email):
+        calls(email)
+        await asyncio.sleep(0.01)
+        return db.get(email)
+
+    users = await asyncio.gather(
+        *(clean_manager._load_user(default_data["sub"]) for _ in range(10))
+    )
+
+    calls.assert_called_once_with(default_data["sub"])
+    assert all(user is users[0] for user in users)
+
+
+@pytest.mark.asyncio
+async def test_coalesced_sync_loader_called_once(clean_manager, default_data, db):
+    calls = Mock()
+
+    @clean_manager.user_loader(coalesce=True)
+    def load_user(email):
+        calls(email)
+        return db.get(email)
+
+    await asyncio.gather(
+        *(clean_manager._load_user(default_data["sub"]) for _ in range(10))
+    )
+
+    calls.assert_called_once_with(default_data["sub"])
+
+
+@pytest.mark.asyncio
+async def test_coalesced_loader_error_reaches_every_waiter(clean_manager, default_data):
+    calls = Mock()
+
+    @clean_manager.user_loader(coalesce=True)
+    async def load_user(email):
+        calls(email)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    results = await asyncio.gather(
+        *(clean_manager._load_user(default_data["sub"]) for _ in range(5)),
+        return_exceptions=True,
+    )
+
+    calls.assert_called_once()
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(clean_manager._user_loads) == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesced_loader_distinct_identifiers(clean_manager, db):
+    calls = Mock()
+
+    @clean_manager.user_loader(coalesce=True)
+    async def load_user(email):
+        calls(email)
+        await asyncio.sleep(0.01)
+        return db.get(email)
+
+    await asyncio.gather(*(clean_manager._load_user(email) for email in db))
+
+    assert calls.call_count == len(db)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_retries_after_cancellation():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "result"
+
+    leader = asyncio.ensure_future(flight.do("key", slow))
+    await started.wait()
+    waiter = asyncio.ensure_future(flight.do("key", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "result"
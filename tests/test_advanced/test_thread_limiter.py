@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+
+def tracking_loader(db, delay=0.02):
+    """
+    Returns a sync loader and a dict holding the maximum number of concurrent calls
+    """
+    state = {"active": 0, "max_active": 0}
+    lock = threading.Lock()
+
+    def load_user(email):
+        with lock:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        time.sleep(delay)
+        with lock:
+            state["active"] -= 1
+        return db.get(email)
+
+    return load_user, state
+
+
+@pytest.mark.asyncio
+async def test_dispatch_decided_at_registration(clean_manager, default_data, db):
+    @clean_manager.user_loader()
+    async def load_user(email):
+        return db.get(email)
+
+    with patch("inspect.iscoroutinefunction") as iscoroutinefunction:
+        user = await clean_manager._load_user(default_data["sub"])
+
+    iscoroutinefunction.assert_not_called()
+    assert user is db[default_data["sub"]]
+
+
+@pytest.mark.asyncio
+async def test_sync_loader_thread_limiter(clean_manager, default_data, db):
+    load_user, state = tracking_loader(db)
+    clean_manager.user_loader(thread_limiter=2)(load_user)
+
+    users = await asyncio.gather(
+        *(clean_manager._load_user(default_data["sub"]) for _ in range(6))
+    )
+
+    assert state["max_active"] == 2
+    assert all(user is db[default_data["sub"]] for user in users)
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_thread_limiter(clean_manager, default_data, db):
+    state = {"active": 0, "max_active": 0}
+    lock = threading.Lock()
+
+    @clean_manager.batch_user_loader(max_batch=1, thread_limiter=1)
+    def load_users(emails):
+        with lock:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        time.sleep(0.01)
+        with lock:
+            state["active"] -= 1
+        return [db.get(email) for email in emails]
+
+    await asyncio.gather(
+        *(clean_manager._load_user(default_data["sub"]) for _ in range(4))
+    )
+    assert state["max_active"] == 1
+
+
+def test_thread_limiter_must_be_positive(clean_manager, load_user_fn):
+    with pytest.raises(ValueError):
+        clean_manager.user_loader(thread_limiter=0)(load_user_fn)
+
+
+def test_thread_limiter_ignored_for_async_loader(clean_manager, db):
+    @clean_manager.user_loader(thread_limiter=2)
+    async def load_user(email):
+        return db.get(email)
+
+    assert clean_manager._user_thread_limiter is None
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("loader_type", [Mock, AsyncMock])
+async def test_user_cache_calls_loader_once(
+    loader_type, clean_manager, default_data, db
+):
+    loader = loader_type(side_effect=db.get)
+    clean_manager.user_loader(cache_ttl=timedelta(minutes=1))(loader)
+    token = clean_manager.create_access_token(data=default_data)
+
+    first = await clean_manager.get_current_user(token)
+    second = await clean_manager.get_current_user(token)
+
+    assert first is second
+    loader.assert_called_once_with(default_data["sub"])
+    assert clean_manager.user_cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_disabled_by_default(clean_manager, default_data, db):
+    loader = Mock(side_effect=db.get)
+    clean_manager.user_loader()(loader)
+
+    await clean_manager._load_user(default_data["sub"])
+    await clean_manager._load_user(default_data["sub"])
+
+    assert clean_manager.user_cache is None
+    assert loader.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_user_cache_entry_expires(clean_manager, default_data, db):
+    loader = Mock(side_effect=db.get)
+    clean_manager.user_loader(cache_ttl=10)(loader)
+    await clean_manager._load_user(default_data["sub"])
+
+    now = clean_manager.user_cache.timer()
+    with patch.object(clean_manager.user_cache, "timer", return_value=now + 11):
+        await clean_manager._load_user(default_data["sub"])
+
+    assert loader.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_user_cache_does_not_store_none(clean_manager, invalid_data):
+    loader = Mock(return_value=None)
+    clean_manager.user_loader(cache_ttl=10)(loader)
+
+    await clean_manager._load_user(invalid_data["username"])
+    await clean_manager._load_user(invalid_data["username"])
+
+    assert loader.call_count == 2
+    assert len(clean_manager.user_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user(clean_manager, default_data, db):
+    loader = Mock(side_effect=db.get)
+    clean_manager.user_loader(cache_ttl=10)(loader)
+    await clean_manager._load_user(default_data["sub"])
+
+    clean_manager.invalidate_user(default_data["sub"])
+    await clean_manager._load_user(default_data["sub"])
+
+    assert loader.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_clear_user_cache(clean_manager, db):
+    loader = Mock(side_effect=db.get)
+    clean_manager.user_loader(cache_ttl=10)(loader)
+    for email in db:
+        await clean_manager._load_user(email)
+
+    clean_manager.clear_user_cache()
+
+    assert len(clean_manager.user_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_user_cache_max_entries(clean_manager, db):
+    clean_manager.user_loader(cache_ttl=10, max_entries=1)(db.get)
+    for email in db:
+        await clean_manager._load_user(email)
+
+    assert len(clean_manager.user_cache) == 1
+    assert clean_manager.user_cache.evictions == 1
+
+
+def test_invalidate_user_without_cache(clean_manager):
+    # should be a no-op
+    clean_manager.invalidate_user("john@doe.com")
+    clean_manager.clear_user_cache()
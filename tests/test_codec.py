@@ -0,0 +1,221 @@
+import base64
+import json
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from jwt.algorithms import get_default_algorithms
+
+from fastapi_login import LoginManager
+from fastapi_login.codec import HS256Codec, TokenEncoder
+from fastapi_login.secrets import to_secret
+
+from .conftest import generate_ed25519_key, generate_rsa_key, require_cryptography
+
+KEY = secrets.token_hex(32).encode()
+OTHER_KEY = secrets.token_hex(32).encode()
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def raw_token(header, payload, key=KEY, alg="HS256") -> str:
+    """
+    Builds a token by hand, so that also malformed headers and payloads can be signed
+    """
+    header_segment = b64(
+        header if isinstance(header, bytes) else json.dumps(header).encode()
+    )
+    payload_segment = b64(
+        payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    )
+    signing_input = f"{header_segment}.{payload_segment}".encode()
+    algorithm = get_default_algorithms()[alg]
+    signature = algorithm.sign(signing_input, algorithm.prepare_key(key))
+    return f"{header_segment}.{payload_segment}.{b64(signature)}"
+
+
+def future(seconds=60):
+    return int(time.time()) + seconds
+
+
+VALID = jwt.encode({"sub": "john@doe.com", "exp": future()}, KEY, "HS256")
+header_segment, payload_segment, signature_segment = VALID.split(".")
+ALG_NONE_HEADER = b64(b'{"alg": "none"}')
+
+
+def flip_last_bits(segment: str) -> str:
+    # Changes only the unused low bits of the last character
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    index = alphabet.index(segment[-1])
+    return segment[:-1] + alphabet[index ^ 1]
+
+
+TOKENS = {
+    "valid": VALID,
+    "valid-typ": jwt.encode(
+        {"sub": "a", "exp": future()}, KEY, "HS256", headers={"typ": "JWT"}
+    ),
+    "valid-extra-claims": jwt.encode(
+        {"sub": "a", "exp": future(), "scopes": ["read"], "nested": {"a": [1]}},
+        KEY,
+        "HS256",
+    ),
+    "expired": jwt.encode({"sub": "a", "exp": future(-10)}, KEY, "HS256"),
+    "expired-now": jwt.encode({"sub": "a", "exp": int(time.time())}, KEY, "HS256"),
+    "exp-float": raw_token({"alg": "HS256"}, {"sub": "a", "exp": future() + 0.5}),
+    "exp-float-expired": raw_token({"alg": "HS256"}, {"exp": future(-10) + 0.5}),
+    "exp-string": raw_token({"alg": "HS256"}, {"exp": str(future())}),
+    "exp-invalid-string": raw_token({"alg": "HS256"}, {"exp": "soon"}),
+    "exp-bool": raw_token({"alg": "HS256"}, {"exp": True}),
+    "exp-null": raw_token({"alg": "HS256"}, {"exp": None}),
+    "no-exp": jwt.encode({"sub": "a"}, KEY, "HS256"),
+    "nbf-future": jwt.encode({"exp": future(), "nbf": future(30)}, KEY, "HS256"),
+    "nbf-past": jwt.encode({"exp": future(), "nbf": future(-30)}, KEY, "HS256"),
+    "iat-future": jwt.encode({"exp": future(), "iat": future(30)}, KEY, "HS256"),
+    "iat-past": jwt.encode({"exp": future(), "iat": future(-30)}, KEY, "HS256"),
+    "aud": jwt.encode({"exp": future(), "aud": "api"}, KEY, "HS256"),
+    "iss": jwt.encode({"exp": future(), "iss": "me"}, KEY, "HS256"),
+    "sub-int": raw_token({"alg": "HS256"}, {"sub": 1, "exp": future()}),
+    "jti-int": raw_token({"alg": "HS256"}, {"jti": 1, "exp": future()}),
+    "wrong-key": jwt.encode({"sub": "a", "exp": future()}, OTHER_KEY, "HS256"),
+    "hs512": jwt.encode({"sub": "a", "exp": future()}, KEY, "HS512"),
+    "alg-none": f"{ALG_NONE_HEADER}.{payload_segment}.",
+    "alg-mismatch": raw_token({"alg": "HS512"}, {"exp": future()}),
+    "alg-missing": raw_token({"typ": "JWT"}, {"exp": future()}),
+    "typ-int": raw_token({"alg": "HS256", "typ": 1}, {"exp": future()}),
+    "kid": jwt.encode({"exp": future()}, KEY, "HS256", headers={"kid": "a"}),
+    "crit": raw_token({"alg": "HS256", "crit": ["exp"]}, {"exp": future()}),
+    "b64-false": raw_token({"alg": "HS256", "b64": False}, {"exp": future()}),
+    "header-list": raw_token(b"[]", {"exp": future()}),
+    "header-invalid-json": raw_token(b"{", {"exp": future()}),
+    "payload-list": raw_token({"alg": "HS256"}, b"[1]"),
+    "payload-invalid-json": raw_token({"alg": "HS256"}, b"{"),
+    "payload-string": raw_token({"alg": "HS256"}, b'"a"'),
+    "tampered-payload": (
+        f"{header_segment}.{b64(json.dumps({'sub': 'x', 'exp': future()}).encode())}"
+        f".{signature_segment}"
+    ),
+    "tampered-signature": (
+        f"{header_segment}.{payload_segment}.{signature_segment[::-1]}"
+    ),
+    "non-canonical-signature": (
+        f"{header_segment}.{payload_segment}.{flip_last_bits(signature_segment)}"
+    ),
+    "padded-signature": f"{VALID}=",
+    "missing-signature": f"{header_segment}.{payload_segment}.",
+    "two-segments": f"{header_segment}.{payload_segment}",
+    "four-segments": f"{VALID}.{signature_segment}",
+    "whitespace": f" {VALID}",
+    "newline": f"{VALID}\n",
+    "non-ascii": f"{header_segment}.{payload_segment}.{signature_segment[:-1]}ä",
+    "invalid-length": f"{header_segment}.{payload_segment}.{signature_segment}A",
+    "empty": "",
+    "junk": "invalid-token",
+    "dots": "...",
+}
+
+
+def outcome(decode, token):
+    try:
+        return True, decode(token)
+    except jwt.PyJWTError:
+        return False, jwt.PyJWTError
+    except Exception as e:
+        # some PyJWT versions raise other errors for malformed claims, e.g. `{"exp": null}`
+        return False, type(e)
+
+
+@pytest.mark.parametrize("token", TOKENS.values(), ids=TOKENS.keys())
+def test_codec_equivalent_to_pyjwt(token):
+    codec = HS256Codec(KEY)
+    expected = outcome(lambda t: jwt.decode(t, KEY, algorithms=["HS256"]), token)
+    assert outcome(codec.decode, token) == expected
+
+
+@require_cryptography
+def test_codec_rejects_keys_refused_by_pyjwt():
+    key = generate_rsa_key(1024)
+    codec = HS256Codec(key)
+    token = raw_token({"alg": "HS256"}, {"exp": future()}, key=b"other")
+
+    with pytest.raises(jwt.PyJWTError):
+        codec.decode(token)
+
+
+def test_manager_fast_codec(token_url, default_data):
+    manager = LoginManager(KEY, token_url, fast_codec=True)
+    token = manager.create_access_token(data=default_data)
+
+    assert manager._get_payload(token)["sub"] == default_data["sub"]
+    with pytest.raises(HTTPException):
+        manager._get_payload(TOKENS["wrong-key"])
+
+
+@require_cryptography
+def test_manager_fast_codec_requires_hs256(token_url):
+    with pytest.raises(ValueError):
+        LoginManager(generate_rsa_key(1024), token_url, "RS256", fast_codec=True)
+
+
+ENCODE_ALGORITHMS = [
+    pytest.param(KEY, "HS256"),
+    pytest.param(generate_rsa_key(1024), "RS256", marks=require_cryptography),
+    pytest.param(generate_ed25519_key(), "EdDSA", marks=require_cryptography),
+]
+
+
+@pytest.mark.parametrize(("secret", "algorithm"), ENCODE_ALGORITHMS)
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"sub": "john@doe.com", "exp": 1700000000},
+        {"sub": "ä€", "exp": 1700000000, "scopes": ["read", "write"], "n": None},
+        {"iss": "me", "exp": 1700000000},
+        {"exp": datetime(2030, 1, 1, tzinfo=timezone.utc)},
+    ],
+)
+def test_token_encoder_matches_pyjwt(secret, algorithm, payload):
+    key = to_secret({"algorithms": algorithm, "secret": secret}).secret_for_encode
+    encoder = TokenEncoder(key, algorithm)
+    assert encoder.encode(payload) == jwt.encode(payload, key, algorithm)
+
+
+def test_create_access_token_matches_datetime_path(token_url, default_data):
+    manager = LoginManager(KEY, token_url)
+    now_ns = 1_700_000_000_999_999_999
+    expires = timedelta(minutes=15, microseconds=1)
+
+    with patch("fastapi_login.fastapi_login.time.time_ns", return_value=now_ns):
+        token = manager.create_access_token(
+            data=default_data, expires=expires, scopes=["read"]
+        )
+
+    now = datetime.fromtimestamp(now_ns // 1000 / 1_000_000, timezone.utc)
+    jti = jwt.decode(token, KEY, algorithms=["HS256"], options={"verify_exp": False})[
+        "jti"
+    ]
+    expected = jwt.encode(
+        {**default_data, "exp": now + expires, "scopes": ["read"], "jti": jti},
+        KEY,
+        "HS256",
+    )
+    assert token == expected
+
+
+def test_create_access_token_reuses_encoder(token_url, default_data):
+    manager = LoginManager(KEY, token_url)
+    manager.create_access_token(data=default_data)
+    encoder = manager._encoder
+    manager.create_access_token(data=default_data)
+    assert manager._encoder is encoder
+
+    manager.secret = to_secret({"algorithms": "HS256", "secret": OTHER_KEY})
+    token = manager.create_access_token(data=default_data)
+    assert manager._encoder is not encoder
+    assert jwt.decode(token, OTHER_KEY, algorithms=["HS256"])
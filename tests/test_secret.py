@@ -3,9 +3,25 @@ import secrets
 import pytest
 from pydantic import ValidationError
 
-from fastapi_login.secrets import AsymmetricSecret, SymmetricSecret, to_secret
+from fastapi_login.secrets import (
+    AsymmetricSecret,
+    EdDSASecret,
+    ES256Secret,
+    ES384Secret,
+    ResolvedSecret,
+    SymmetricSecret,
+    load_secret,
+    to_secret,
+)
 
-from .conftest import generate_rsa_key, require_cryptography
+from .conftest import (
+    generate_ec_key,
+    generate_ed25519_key,
+    generate_rsa_key,
+    generate_rsa_key_der,
+    generate_rsa_key_object,
+    require_cryptography,
+)
 
 key_size = 1024
 happypath_parametrize_argvalues = [
@@ -35,6 +51,33 @@ happypath_parametrize_argvalues = [
         },
         marks=require_cryptography,
     ),
+    pytest.param(
+        AsymmetricSecret,
+        "RS256",
+        generate_rsa_key_der(key_size),
+        marks=require_cryptography,
+    ),
+    pytest.param(
+        AsymmetricSecret,
+        "RS256",
+        generate_rsa_key_object(key_size),
+        marks=require_cryptography,
+    ),
+    pytest.param(
+        AsymmetricSecret,
+        "RS256",
+        {"private_key": generate_rsa_key_object(key_size)},
+        marks=require_cryptography,
+    ),
+    pytest.param(
+        ES256Secret, "ES256", generate_ec_key("secp256r1"), marks=require_cryptography
+    ),
+    pytest.param(
+        ES384Secret, "ES384", generate_ec_key("secp384r1"), marks=require_cryptography
+    ),
+    pytest.param(
+        EdDSASecret, "EdDSA", generate_ed25519_key(), marks=require_cryptography
+    ),
     #
     # Treat rsa-private-key as secret
     pytest.param(
@@ -68,6 +111,17 @@ invalid_parametrize_argvalues = [
         },
         marks=require_cryptography,
     ),
+    pytest.param(
+        "RS256",
+        {"private_key": generate_rsa_key(key_size), "password": b"not-needed"},
+        marks=require_cryptography,
+    ),
+    # Key type does not match the algorithm
+    pytest.param("RS256", generate_ec_key(), marks=require_cryptography),
+    pytest.param("ES256", generate_rsa_key(key_size), marks=require_cryptography),
+    pytest.param("ES256", generate_ec_key("secp384r1"), marks=require_cryptography),
+    pytest.param("ES384", generate_ec_key("secp256r1"), marks=require_cryptography),
+    pytest.param("EdDSA", generate_ec_key(), marks=require_cryptography),
 ]
 
 
@@ -75,3 +129,45 @@ invalid_parametrize_argvalues = [
 def test_secret_parsing_case_invalid_input(alg, secret):
     with pytest.raises(ValidationError):
         to_secret({"algorithms": alg, "secret": secret})
+
+
+@require_cryptography
+def test_asymmetric_secret_holds_key_objects():
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    s = to_secret({"algorithms": "RS256", "secret": generate_rsa_key(key_size)})
+    assert isinstance(s.secret_for_encode, rsa.RSAPrivateKey)
+    assert isinstance(s.secret_for_decode, rsa.RSAPublicKey)
+
+
+@pytest.mark.parametrize(
+    ("secret_type", "alg", "secret"), happypath_parametrize_argvalues
+)
+def test_load_secret_resolves_key_material(secret_type, alg, secret):
+    model = to_secret({"algorithms": alg, "secret": secret})
+    resolved = load_secret({"algorithms": alg, "secret": secret})
+
+    assert isinstance(resolved, ResolvedSecret)
+    assert resolved.algorithms == alg
+    assert type(resolved.secret_for_encode) is type(model.secret_for_encode)
+    assert type(resolved.secret_for_decode) is type(model.secret_for_decode)
+
+
+def test_resolved_secret_is_immutable():
+    key = secrets.token_hex(16).encode()
+    resolved = load_secret({"algorithms": "HS256", "secret": key})
+
+    assert resolved.secret_for_decode == resolved.secret_for_encode == key
+    with pytest.raises(AttributeError):
+        resolved.secret_for_encode = b"other"
+    with pytest.raises(AttributeError):
+        del resolved.secret_for_decode
+    with pytest.raises(AttributeError):
+        resolved.other = 1
+    assert key.decode() not in repr(resolved)
+
+
+@pytest.mark.parametrize(("alg", "secret"), invalid_parametrize_argvalues)
+def test_load_secret_invalid_input(alg, secret):
+    with pytest.raises(ValidationError):
+        load_secret({"algorithms": alg, "secret": secret})